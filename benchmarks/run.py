@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+# Benchmarks never need a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from classes.assets import AssetManager, CACHE_DIR
+from classes.game import draw_game
+from classes.panel import CommandPanel
+from classes.path import Path
+from classes.state import GameState, Command
+from utils.colors import COLORS
+from utils.constants import CONSTANTS
+from utils.directions import Direction
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def measure(func, number, repeat):
+  # Seconds per call for each of `repeat` rounds of `number` calls
+  rounds = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for _ in range(number):
+      func()
+    rounds.append((time.perf_counter() - start) / number)
+  return rounds
+
+def program(length):
+  # Steps right and left along the top row, so every command is executed
+  return [Command(Direction.RIGHT if i % 2 == 0 else Direction.LEFT, COLORS.RED) for i in range(length)]
+
+def bench_path_generation(size):
+  return lambda: Path(size)
+
+def bench_execute(length):
+  # Runs a whole program on an open board, one execute_next_command per step
+  path = Path(CONSTANTS.GRID_SIZE, goal_pos=[CONSTANTS.GRID_SIZE - 1] * 2, obstacles=[])
+  state = GameState([path])
+  commands = program(length)
+  def run():
+    state.reset()
+    state.commands = list(commands)
+    state.play()
+    while state.is_playing:
+      state.execute_next_command()
+  return run, length
+
+def bench_draw_game(screen, panel, size, length):
+  path = Path(size, goal_pos=[size - 1] * 2, obstacles=[[size // 2, size // 2]])
+  state = GameState([path])
+  state.commands = program(length)
+  return lambda: draw_game(screen, state, panel)
+
+def bench_panel_assets(y_position, cache_dir=CACHE_DIR):
+  return lambda: CommandPanel(y_position, AssetManager(cache_dir=cache_dir))
+
+def run_benchmarks(quick=False):
+  repeat = 3 if quick else 7
+  scale = 0.2 if quick else 1
+  screen = pygame.display.set_mode((CONSTANTS.CELL_SIZE * CONSTANTS.VIEWPORT_SIZE,
+                                    CONSTANTS.CELL_SIZE * CONSTANTS.VIEWPORT_SIZE + CONSTANTS.COMMAND_PANEL_HEIGHT))
+  y_position = CONSTANTS.CELL_SIZE * CONSTANTS.VIEWPORT_SIZE
+  panel = CommandPanel(y_position)
+  results = {}
+
+  def record(name, func, number, per=1):
+    rounds = [seconds / per for seconds in measure(func, max(1, int(number * scale)), repeat)]
+    results[name] = {
+      "median_us": statistics.median(rounds) * 1e6,
+      "min_us": min(rounds) * 1e6,
+      "rounds": len(rounds),
+    }
+    print(f"{name:40s} {results[name]['median_us']:12.2f} us", file=sys.stderr)
+
+  for size in (6, 30, 100):
+    record(f"path_generation/grid={size}", bench_path_generation(size), 2000 // size)
+  for length in (10, 1000):
+    run, steps = bench_execute(length)
+    record(f"execute_next_command/len={length}", run, 20000 // length, per=steps)
+  for size in (6, 100, 1000):
+    for length in (5, 5000):
+      record(f"draw_game/grid={size}/len={length}", bench_draw_game(screen, panel, size, length), 100)
+  record("command_panel/assets", bench_panel_assets(y_position), 20)
+  record("command_panel/assets_uncached", bench_panel_assets(y_position, None), 20)
+  return results
+
+def compare(results, baseline, tolerance):
+  # Names whose median got slower than the baseline by more than `tolerance`
+  regressions = []
+  for name, result in results.items():
+    if name not in baseline:
+      continue
+    ratio = result["median_us"] / baseline[name]["median_us"]
+    if ratio > 1 + tolerance:
+      regressions.append((name, ratio))
+  return regressions
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Headless benchmarks for mew-game")
+  parser.add_argument("--output", help="write results as JSON to this file")
+  parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare against")
+  parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+  parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing, e.g. 0.25")
+  parser.add_argument("--quick", action="store_true", help="fewer iterations, for smoke runs")
+  args = parser.parse_args(argv)
+
+  pygame.display.init()
+  report = {
+    "python": platform.python_version(),
+    "pygame": pygame.version.ver,
+    "machine": platform.machine(),
+    "results": run_benchmarks(args.quick),
+  }
+  pygame.quit()
+
+  if args.output:
+    with open(args.output, "w") as file:
+      json.dump(report, file, indent=2, sort_keys=True)
+  if args.update_baseline:
+    with open(args.baseline, "w") as file:
+      json.dump(report, file, indent=2, sort_keys=True)
+    return 0
+
+  if not os.path.exists(args.baseline):
+    print(f"no baseline at {args.baseline}; run with --update-baseline", file=sys.stderr)
+    return 0
+  with open(args.baseline) as file:
+    baseline = json.load(file)["results"]
+  regressions = compare(report["results"], baseline, args.tolerance)
+  for name, ratio in regressions:
+    print(f"REGRESSION {name}: {ratio:.2f}x baseline", file=sys.stderr)
+  return 1 if regressions else 0
+
+if __name__ == "__main__":
+  sys.exit(main())
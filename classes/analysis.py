@@ -0,0 +1,182 @@
+import argparse
+import csv
+import math
+import sys
+from dataclasses import dataclass, field
+
+from classes.bulk import pool_map, unique_levels
+from classes.pack import LevelPack
+from classes.path import UNREACHABLE
+from utils.cells import CELLS
+from utils.constants import CONSTANTS
+from utils.directions import Direction, DELTAS
+from utils.outcomes import Outcome
+
+MOVES = list(Direction)
+
+
+@dataclass
+class LevelStats:
+    par: int
+    max_length: int
+    # Programs that first reach the goal on their k-th command, for k = 0..max_length
+    solutions: list = field(default_factory=list)
+    # Programs that leave the board / hit an obstacle on their k-th command
+    out_of_bounds: list = field(default_factory=list)
+    obstacle: list = field(default_factory=list)
+
+    def winning(self, length):
+        # Programs of exactly `length` commands that win; commands after
+        # reaching the goal are never run, so any tail is allowed
+        return sum(count * 4 ** (length - step) for step, count in enumerate(self.solutions[:length + 1]))
+
+    def winning_up_to(self, length):
+        return sum(self.winning(n) for n in range(1, length + 1))
+
+    def failing(self, step):
+        return self.out_of_bounds[step] + self.obstacle[step]
+
+    @property
+    def difficulty(self):
+        # Bits of luck a random program of par commands needs to win
+        if self.par == UNREACHABLE or self.par > self.max_length:
+            return None
+        return math.ceil(-math.log2(self.solutions[self.par] / 4 ** self.par))
+
+
+def ending(outcome):
+  # Moves that end the program are stored as negative numbers, so they
+  # never collide with a cell index
+  return -1 - outcome
+
+WIN = ending(Outcome.WIN)
+OUT_OF_BOUNDS = ending(Outcome.OUT_OF_BOUNDS)
+OBSTACLE = ending(Outcome.OBSTACLE)
+
+def transitions(path):
+  # For every cell, where each move leads: the next cell index, or a
+  # negative ending() for the Outcome that ends the program there
+  table = []
+  for index in range(path.size * path.size):
+    pos = (index % path.size, index // path.size)
+    moves = []
+    for direction in MOVES:
+      dx, dy = DELTAS[direction]
+      new_pos = (pos[0] + dx, pos[1] + dy)
+      if not path.in_bounds(new_pos):
+        moves.append(OUT_OF_BOUNDS)
+      elif path.cell(new_pos) == CELLS.OBSTACLE:
+        moves.append(OBSTACLE)
+      elif path.cell(new_pos) == CELLS.GOAL:
+        moves.append(WIN)
+      else:
+        moves.append(path.index(new_pos))
+    table.append(moves)
+  return table
+
+def analyze(path, max_length=CONSTANTS.ANALYSIS_LENGTH):
+  # Counts every program of up to max_length commands by outcome, by
+  # walking (cell, step) states: programs that agree on where the player
+  # stands after k commands behave the same from there on, so each step
+  # costs one pass over the board instead of 4^k simulations.
+  table = transitions(path)
+  stats = LevelStats(path.par, max_length, [0], [0], [0])
+  running = {path.index(path.start_pos): 1}
+  for _ in range(max_length):
+    following = {}
+    wins = out_of_bounds = obstacle = 0
+    for index, count in running.items():
+      for move in table[index]:
+        if move >= 0:
+          following[move] = following.get(move, 0) + count
+        elif move == WIN:
+          wins += count
+        elif move == OUT_OF_BOUNDS:
+          out_of_bounds += count
+        else:
+          obstacle += count
+    stats.solutions.append(wins)
+    stats.out_of_bounds.append(out_of_bounds)
+    stats.obstacle.append(obstacle)
+    running = following
+  return stats
+
+def reachable(distance, moves):
+  # The board is a checkerboard, so spare moves have to come in pairs
+  return distance != UNREACHABLE and distance <= moves and (moves - distance) % 2 == 0
+
+def solutions(path, max_length=CONSTANTS.ANALYSIS_LENGTH):
+  # Winning programs with no commands left over, shortest first. Branches
+  # that cannot reach the goal in the commands left are never entered.
+  table = transitions(path)
+  distance = path.distances
+  start = path.index(path.start_pos)
+  if distance[start] == UNREACHABLE:
+    return
+  for length in range(distance[start], max_length + 1):
+    stack = [(start, [])]
+    while stack:
+      index, program = stack.pop()
+      left = length - len(program)
+      for direction, move in zip(MOVES, table[index]):
+        if move == WIN:
+          if left == 1:
+            yield program + [direction]
+        elif move >= 0 and reachable(distance[move], left - 1):
+          stack.append((move, program + [direction]))
+
+
+def analyze_chunk(chunk, max_length):
+  # Runs in a worker process
+  return [(number, analyze(path, max_length)) for number, path in chunk]
+
+def analyze_levels(paths, max_length=CONSTANTS.ANALYSIS_LENGTH, workers=None, chunk_size=CONSTANTS.ANALYSIS_CHUNK):
+  # (level number, LevelStats) pairs, streamed as workers finish, not in order
+  levels = enumerate(paths)
+  chunks = iter(lambda: [level for _, level in zip(range(chunk_size), levels)], [])
+  jobs = ((analyze_chunk, chunk, max_length) for chunk in chunks)
+  for results in pool_map(jobs, workers):
+    yield from results
+
+def rank_levels(paths, max_length=CONSTANTS.ANALYSIS_LENGTH, workers=None):
+  # Levels tagged with their measured difficulty, easiest first, ready to
+  # hand to GameState as its rotation; unsolvable levels are dropped
+  paths = list(paths)
+  ranked = []
+  for number, stats in analyze_levels(paths, max_length, workers):
+    if stats.difficulty is not None:
+      paths[number].difficulty = stats.difficulty
+      ranked.append(paths[number])
+  ranked.sort(key=lambda path: (path.difficulty, path.par))
+  return ranked
+
+REPORT_FIELDS = ["level", "par", "difficulty", "shortest_solutions", "winning_up_to_max", "first_failure_step",
+                 "failures_by_step"]
+
+def write_report(results, file):
+  # One CSV row per level, written as results arrive
+  writer = csv.writer(file)
+  writer.writerow(REPORT_FIELDS)
+  for number, stats in results:
+    failures = [stats.failing(step) for step in range(1, stats.max_length + 1)]
+    first_failure = next((step for step, count in enumerate(failures, 1) if count), "")
+    shortest = stats.solutions[stats.par] if 0 <= stats.par <= stats.max_length else 0
+    writer.writerow([number, stats.par, stats.difficulty, shortest, stats.winning_up_to(stats.max_length),
+                     first_failure, " ".join(map(str, failures))])
+    file.flush()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Count winning and failing programs for every level")
+  parser.add_argument("--pack", metavar="FILE", default=None, help="analyze a level pack")
+  parser.add_argument("--count", type=int, default=1000, help="otherwise analyze this many generated levels")
+  parser.add_argument("--grid-size", type=int, default=None)
+  parser.add_argument("--max-length", type=int, default=CONSTANTS.ANALYSIS_LENGTH)
+  parser.add_argument("--workers", type=int, default=None)
+  parser.add_argument("--report", metavar="FILE", default=None, help="CSV output, stdout by default")
+  args = parser.parse_args()
+  levels = LevelPack(args.pack) if args.pack else unique_levels(args.count, args.grid_size)
+  out = open(args.report, "w", newline="") if args.report else sys.stdout
+  write_report(analyze_levels(levels, args.max_length, args.workers), out)
+  if args.report:
+    out.close()
@@ -0,0 +1,132 @@
+import glob
+import hashlib
+import os
+
+import pygame
+
+from utils.constants import CONSTANTS
+from utils.directions import Direction
+
+ASSETS_DIR = "./assets"
+ASSET_FILES = {direction.value: f"{direction.value}.svg" for direction in Direction}
+ASSET_FILES["play"] = "play.png"
+
+# Every size the UI asks for up front, so the atlas is packed once
+DEFAULT_SIZES = {direction.value: [CONSTANTS.BUTTON_SIZE, CONSTANTS.CHIP_SIZE] for direction in Direction}
+DEFAULT_SIZES["play"] = [CONSTANTS.PLAY_BUTTON_SIZE]
+
+ATLAS_WIDTH = 512
+
+# Rasterized assets survive between launches here; set MEW_ASSET_CACHE to move it
+CACHE_DIR = os.environ.get("MEW_ASSET_CACHE",
+                           os.path.join(os.path.expanduser("~"), ".cache", "mew-game", "assets"))
+
+def _size(size):
+  return (size, size) if isinstance(size, int) else tuple(size)
+
+class RasterCache:
+  # Pre-scaled RGBA pixels on disk, keyed by a hash of the source file and
+  # the target size, so an edited asset simply misses and is re-rasterized.
+  # The cache is best effort: any filesystem error falls back to decoding.
+  def __init__(self, directory=CACHE_DIR):
+    self.directory = directory
+    self.digests = {}
+
+  def digest(self, filename):
+    if filename not in self.digests:
+      with open(filename, "rb") as file:
+        self.digests[filename] = hashlib.sha1(file.read()).hexdigest()[:16]
+    return self.digests[filename]
+
+  def entry(self, name, size, digest="*"):
+    return os.path.join(self.directory, f"{name}-{size[0]}x{size[1]}-{digest}.rgba")
+
+  def load(self, name, filename, size):
+    try:
+      with open(self.entry(name, size, self.digest(filename)), "rb") as file:
+        pixels = file.read()
+    except OSError:
+      return None
+    if len(pixels) != size[0] * size[1] * 4:
+      return None
+    return pygame.image.frombuffer(pixels, size, "RGBA")
+
+  def store(self, name, filename, size, surface):
+    entry = self.entry(name, size, self.digest(filename))
+    try:
+      os.makedirs(self.directory, exist_ok=True)
+      # Drop entries rasterized from older versions of the file
+      for stale in glob.glob(self.entry(name, size)):
+        if stale != entry:
+          os.remove(stale)
+      with open(entry + ".tmp", "wb") as file:
+        file.write(pygame.image.tobytes(surface, "RGBA"))
+      os.replace(entry + ".tmp", entry)
+    except OSError:
+      pass
+
+class AssetManager:
+  # Loads each asset once and packs every requested size into one atlas
+  # surface in the display pixel format; images are sub-rects of the atlas.
+  def __init__(self, sizes=DEFAULT_SIZES, cache_dir=CACHE_DIR):
+    self.cache = RasterCache(cache_dir) if cache_dir else None
+    self.sources = {}
+    self.scaled_images = {}
+    self.rects = {}
+    self.images = {}
+    self.atlas = None
+    for name, name_sizes in sizes.items():
+      for size in name_sizes:
+        self.rects[(name, _size(size))] = None
+    self.build()
+
+  def source(self, name):
+    if name not in self.sources:
+      image = pygame.image.load(f"{ASSETS_DIR}/{ASSET_FILES[name]}")
+      if pygame.display.get_surface() is not None:
+        image = image.convert_alpha()
+      self.sources[name] = image
+    return self.sources[name]
+
+  def scaled(self, name, size):
+    key = (name, size)
+    if key not in self.scaled_images:
+      filename = f"{ASSETS_DIR}/{ASSET_FILES[name]}"
+      image = self.cache.load(name, filename, size) if self.cache else None
+      if image is None:
+        image = pygame.transform.scale(self.source(name), size)
+        if self.cache:
+          self.cache.store(name, filename, size, image)
+      self.scaled_images[key] = image
+    return self.scaled_images[key]
+
+  def image(self, name, size):
+    key = (name, _size(size))
+    if key not in self.images:
+      # Sizes nobody asked for up front are rare; repack to include them
+      self.rects[key] = None
+      self.build()
+    return self.images[key]
+
+  def build(self):
+    # Shelf packing: tallest first, left to right, wrapping at ATLAS_WIDTH
+    keys = sorted(self.rects, key=lambda key: key[1][1], reverse=True)
+    x = y = shelf = width = 0
+    for key in keys:
+      w, h = key[1]
+      if x + w > ATLAS_WIDTH and x > 0:
+        x, y, shelf = 0, y + shelf, 0
+      self.rects[key] = pygame.Rect(x, y, w, h)
+      x += w
+      shelf = max(shelf, h)
+      width = max(width, x)
+
+    self.atlas = pygame.Surface((max(width, 1), max(y + shelf, 1)), pygame.SRCALPHA)
+    if pygame.display.get_surface() is not None:
+      self.atlas = self.atlas.convert_alpha()
+    self.atlas.fill((0, 0, 0, 0))
+    for (name, size), rect in self.rects.items():
+      # Copy pixels as-is instead of alpha blending onto the cleared atlas
+      self.atlas.blit(self.scaled(name, size), rect,
+                      special_flags=pygame.BLEND_RGBA_MAX)
+    self.images = {key: self.atlas.subsurface(rect) for key, rect in self.rects.items()}
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.cells import CELLS
+from utils.directions import Direction, DELTAS, CODES
+from utils.outcomes import Outcome
+
+# Lookup tables indexed by direction code
+DX = np.array([DELTAS[direction][0] for direction in Direction], dtype=np.int32)
+DY = np.array([DELTAS[direction][1] for direction in Direction], dtype=np.int32)
+
+
+@dataclass
+class BatchResult:
+    outcome: np.ndarray    # (programs, levels) Outcome codes
+    final_pos: np.ndarray  # (programs, levels, 2) x, y
+    steps: np.ndarray      # (programs, levels) commands consumed
+
+    def wins(self):
+        return self.outcome == Outcome.WIN
+
+
+def _code(command):
+  if isinstance(command, Direction):
+    return CODES[command]
+  if hasattr(command, "direction"):
+    return CODES[command.direction]
+  return int(command)
+
+def encode_programs(programs):
+  # Pads every program to the longest one with -1
+  if isinstance(programs, np.ndarray):
+    codes = programs.astype(np.int8, copy=False)
+    return codes, (codes >= 0).sum(axis=1).astype(np.int32)
+
+  lengths = np.array([len(program) for program in programs], dtype=np.int32)
+  codes = np.full((len(programs), max(lengths.max(initial=0), 1)), -1, dtype=np.int8)
+  for i, program in enumerate(programs):
+    codes[i, :lengths[i]] = [_code(command) for command in program]
+  return codes, lengths
+
+def encode_paths(paths):
+  sizes = np.array([path.size for path in paths], dtype=np.int32)
+  starts = np.array([path.start_pos for path in paths], dtype=np.int32).reshape(-1, 2)
+  goals = np.array([path.goal_pos for path in paths], dtype=np.int32).reshape(-1, 2)
+
+  # Obstacle masks indexed [level, y, x], padded to the largest grid
+  side = max(sizes.max(initial=0), 1)
+  blocked = np.zeros((len(paths), side, side), dtype=bool)
+  for i, path in enumerate(paths):
+    cells = np.frombuffer(path.occupancy, dtype=np.uint8).reshape(path.size, path.size)
+    blocked[i, :path.size, :path.size] = cells == CELLS.OBSTACLE
+  return starts, goals, sizes, blocked
+
+def evaluate(programs, paths):
+  codes, lengths = encode_programs(programs)
+  starts, goals, sizes, blocked = encode_paths(paths)
+  n_programs, n_levels = len(lengths), len(sizes)
+
+  program = np.repeat(np.arange(n_programs), n_levels)
+  level = np.tile(np.arange(n_levels), n_programs)
+  x = starts[level, 0].copy()
+  y = starts[level, 1].copy()
+  outcome = np.full(program.size, Outcome.OUT_OF_COMMANDS, dtype=np.int8)
+  steps = np.zeros(program.size, dtype=np.int32)
+
+  # Indices of pairs that are still running, shrinking as they finish
+  live = np.flatnonzero(lengths[program] > 0)
+  for t in range(codes.shape[1]):
+    if live.size == 0:
+      break
+    p = program[live]
+    lv = level[live]
+    code = codes[p, t]
+    nx = x[live] + DX[code]
+    ny = y[live] + DY[code]
+    size = sizes[lv]
+
+    inside = (nx >= 0) & (nx < size) & (ny >= 0) & (ny < size)
+    hit = np.zeros(live.size, dtype=bool)
+    hit[inside] = blocked[lv[inside], ny[inside], nx[inside]]
+    moved = inside & ~hit
+    won = moved & (nx == goals[lv, 0]) & (ny == goals[lv, 1])
+
+    steps[live] = t + 1
+    x[live[moved]] = nx[moved]
+    y[live[moved]] = ny[moved]
+    outcome[live[~inside]] = Outcome.OUT_OF_BOUNDS
+    outcome[live[hit]] = Outcome.OBSTACLE
+    outcome[live[won]] = Outcome.WIN
+
+    live = live[moved & ~won & (lengths[p] > t + 1)]
+
+  return BatchResult(
+    outcome=outcome.reshape(n_programs, n_levels),
+    final_pos=np.stack([x, y], axis=1).reshape(n_programs, n_levels, 2),
+    steps=steps.reshape(n_programs, n_levels),
+  )
@@ -0,0 +1,93 @@
+import itertools
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from classes.path import Path
+from utils.constants import CONSTANTS
+
+CHUNK_SIZE = 256
+
+# The eight rotations and reflections of an n x n grid
+SYMMETRIES = [
+  lambda x, y, n: (x, y),
+  lambda x, y, n: (n - 1 - y, x),
+  lambda x, y, n: (n - 1 - x, n - 1 - y),
+  lambda x, y, n: (y, n - 1 - x),
+  lambda x, y, n: (n - 1 - x, y),
+  lambda x, y, n: (x, n - 1 - y),
+  lambda x, y, n: (y, x),
+  lambda x, y, n: (n - 1 - y, n - 1 - x),
+]
+
+def canonical_key(path):
+  # Smallest encoding over the symmetries that leave the start in place,
+  # so a board and its mirror images share one key.
+  n = path.size
+  start = tuple(path.start_pos)
+  obstacles = path.obstacles
+  keys = []
+  for transform in SYMMETRIES:
+    if transform(*start, n) != start:
+      continue
+    mask = 0
+    for x, y in obstacles:
+      tx, ty = transform(x, y, n)
+      mask |= 1 << (ty * n + tx)
+    keys.append((n, *start, *transform(*path.goal_pos, n), mask))
+  return min(keys)
+
+def generate_chunk(count, size, seed):
+  # Runs in a worker process; forked workers share the parent's random
+  # state, so every chunk gets its own seed.
+  random.seed(seed)
+  chunk = []
+  for _ in range(count):
+    path = Path(size)
+    chunk.append((canonical_key(path), path))
+  return chunk
+
+def pool_map(jobs, workers=None):
+  # Runs (function, *args) jobs across a process pool and yields their
+  # results as they finish, not in order. Only a bounded number of jobs
+  # are in flight, so `jobs` can be an endless generator.
+  workers = workers or os.cpu_count() or 1
+  jobs = iter(jobs)
+  with ProcessPoolExecutor(workers) as pool:
+    def submit():
+      job = next(jobs, None)
+      if job is not None:
+        pending.append(pool.submit(*job))
+
+    pending = deque()
+    for _ in range(workers * 2):
+      submit()
+    try:
+      while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+          pending.remove(future)
+          yield future.result()
+          submit()
+    finally:
+      # Stopped early: drop what has not started
+      for future in pending:
+        future.cancel()
+
+def unique_levels(count=None, size=None, workers=None, chunk_size=CHUNK_SIZE, seed=None):
+  # Stream of distinct levels generated across a process pool
+  size = size or CONSTANTS.GRID_SIZE
+  seeds = random.Random(seed)
+  seen = set()
+  produced = 0
+  jobs = ((generate_chunk, chunk_size, size, seeds.getrandbits(64)) for _ in itertools.count())
+  for chunk in pool_map(jobs, workers):
+    for key, path in chunk:
+      if key in seen:
+        continue
+      seen.add(key)
+      yield path
+      produced += 1
+      if count is not None and produced >= count:
+        return
@@ -0,0 +1,34 @@
+from utils.constants import CONSTANTS
+
+class Camera:
+  # Window onto the board, in cells. The board is drawn from (x, y) and the
+  # view scrolls once the player gets within `margin` cells of its edge.
+  def __init__(self, width=CONSTANTS.VIEWPORT_SIZE, height=CONSTANTS.VIEWPORT_SIZE, margin=1):
+    self.width = width
+    self.height = height
+    self.margin = margin
+    self.x = 0
+    self.y = 0
+
+  def follow(self, pos, board_size):
+    # Returns True when the view moved
+    old = (self.x, self.y)
+    self.x = self.scroll(self.x, pos[0], self.width, board_size)
+    self.y = self.scroll(self.y, pos[1], self.height, board_size)
+    return (self.x, self.y) != old
+
+  def scroll(self, start, pos, length, board_size):
+    margin = min(self.margin, (length - 1) // 2)
+    if pos < start + margin:
+      start = pos - margin
+    elif pos > start + length - 1 - margin:
+      start = pos - length + 1 + margin
+    return max(0, min(start, board_size - length))
+
+  def cells(self, board_size):
+    # Visible column and row ranges, clipped to the board
+    return (range(self.x, min(self.x + self.width, board_size)),
+            range(self.y, min(self.y + self.height, board_size)))
+
+  def to_screen(self, pos):
+    return ((pos[0] - self.x) * CONSTANTS.CELL_SIZE, (pos[1] - self.y) * CONSTANTS.CELL_SIZE)
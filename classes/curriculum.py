@@ -0,0 +1,194 @@
+import random
+
+import numpy as np
+
+from classes.path import Path, UNREACHABLE
+from utils.constants import CONSTANTS
+from utils.directions import Direction, DELTAS
+
+# Larger than any turn count, so it never wins a minimum
+NO_ROUTE = np.iinfo(np.int16).max // 2
+
+# Boards are handled flattened with a blank row above and below and a
+# blank column on the right, so a neighbour is a fixed offset away and
+# stepping off any edge lands on padding
+def pad(grids):
+  boards, height, width = grids.shape
+  padded = np.zeros((boards, height + 2, width + 1), dtype=grids.dtype)
+  padded[:, 1:-1, :-1] = grids
+  return padded.reshape(boards, -1)
+
+def offsets(width):
+  return [dy * (width + 1) + dx for dx, dy in DELTAS.values()]
+
+def spread(source, target, offset, combine):
+  # target[:, i] = combine(target[:, i], source[:, i - offset]), in place:
+  # each cell takes in its neighbour one step back along the offset
+  if offset > 0:
+    combine(target[:, offset:], source[:, :-offset], out=target[:, offset:])
+  else:
+    combine(target[:, :offset], source[:, -offset:], out=target[:, :offset])
+
+def distance_fields(free, sources, width):
+  # Breadth-first distances from one source cell per board, for a whole
+  # batch at once, on padded boards
+  boards = np.arange(len(free))
+  distances = np.full(free.shape, UNREACHABLE, dtype=np.int16)
+  frontier = np.zeros(free.shape, dtype=bool)
+  frontier[boards, sources] = True
+  distances[frontier] = 0
+  step = 0
+  while frontier.any():
+    step += 1
+    grown = frontier.copy()
+    for offset in offsets(width):
+      spread(frontier, grown, offset, np.logical_or)
+    frontier = grown & free & (distances == UNREACHABLE)
+    distances[frontier] = step
+  return distances
+
+def fewest_turns(from_start, from_goal, par, goals, width):
+  # Fewest changes of direction over all shortest routes. Cells on some
+  # shortest route are walked layer by layer from the start, keeping the
+  # best turn count for each direction the cell can be entered from.
+  boards = np.arange(len(par))
+  on_route = (from_start >= 0) & (from_goal >= 0) & (from_start + from_goal == par[:, None])
+  turns = np.full((len(DELTAS),) + from_start.shape, NO_ROUTE, dtype=np.int16)
+  # The first move is free whichever way it goes
+  turns[:, from_start == 0] = 0
+  for layer in range(1, int(par.max(initial=0)) + 1):
+    cells = on_route & (from_start == layer)
+    turned = turns.min(axis=0) + 1
+    for direction, offset in enumerate(offsets(width)):
+      entered = np.full_like(turned, NO_ROUTE)
+      spread(np.minimum(turns[direction], turned), entered, offset, np.minimum)
+      turns[direction][cells] = entered[cells]
+  result = turns[:, boards, goals].min(axis=0)
+  return np.where(par >= 0, result, UNREACHABLE)
+
+def measure(blocked, starts, goals):
+  # Par and fewest turns for a batch of (boards, size, size) obstacle grids
+  # indexed [board, y, x], with starts and goals as (boards, 2) x, y
+  boards = np.arange(len(blocked))
+  width = blocked.shape[2]
+  free = pad(~blocked)
+  starts = (starts[:, 1].astype(np.intp) + 1) * (width + 1) + starts[:, 0]
+  goals = (goals[:, 1].astype(np.intp) + 1) * (width + 1) + goals[:, 0]
+  from_goal = distance_fields(free, goals, width)
+  from_start = distance_fields(free, starts, width)
+  par = from_goal[boards, starts]
+  return par, fewest_turns(from_start, from_goal, par, goals, width)
+
+
+def build_route(size, par, turns, rng, attempts=64):
+  # Self-avoiding walk from the top-left corner with `turns` corners and
+  # `par` moves that never runs alongside itself, so walling off every
+  # other cell leaves it as the only route
+  for _ in range(attempts):
+    cuts = sorted(rng.sample(range(1, par), turns))
+    lengths = [end - start for start, end in zip([0] + cuts, cuts + [par])]
+    cells = [(0, 0)]
+    taken = {(0, 0)}
+    dx, dy = rng.choice([DELTAS[Direction.RIGHT], DELTAS[Direction.DOWN]])
+    for number, length in enumerate(lengths):
+      x, y = cells[-1]
+      if number:
+        # Turn left or right, whichever leaves room for the next leg
+        sides = [(ex, ey) for ex, ey in ((dy, -dx), (-dy, dx))
+                 if 0 <= x + ex * length < size and 0 <= y + ey * length < size]
+        if not sides:
+          break
+        dx, dy = rng.choice(sides)
+      for _ in range(length):
+        x, y = x + dx, y + dy
+        touching = sum((x + ex, y + ey) in taken for ex, ey in DELTAS.values())
+        if not (0 <= x < size and 0 <= y < size) or (x, y) in taken or touching > 1:
+          break
+        cells.append((x, y))
+        taken.add((x, y))
+      else:
+        continue
+      break
+    else:
+      return cells
+  return None
+
+def generate_levels(count, par, turns=0, density=0.3, size=None, candidates=CONSTANTS.CURRICULUM_CANDIDATES,
+                    seed=None):
+  # Levels built to a target par, number of turns and obstacle density.
+  # Each level starts from a constructed route; `candidates` obstacle
+  # layouts around it are scored together and the closest to the targets
+  # is kept. Returns Paths with `difficulty` set to par + turns.
+  size = size or CONSTANTS.GRID_SIZE
+  if count <= 0:
+    return []
+  rng = np.random.default_rng(seed)
+  route_rng = random.Random(int(rng.integers(1 << 32)))
+  par = max(1, min(par, size * size - 1))
+  turns = max(0, min(turns, par - 1))
+
+  # Each route keeps the target it was actually built to
+  routes = []
+  targets = np.zeros((count, 2), dtype=np.int16)
+  for i in range(count):
+    route_par, route_turns = par, turns
+    route = build_route(size, route_par, route_turns, route_rng)
+    while route is None:
+      # Target does not fit on this board; ease off towards a straight run
+      if route_turns:
+        route_turns -= 1
+      else:
+        route_par -= 1
+      route = build_route(size, route_par, route_turns, route_rng)
+    routes.append(route)
+    targets[i] = route_par, route_turns
+
+  # Obstacles are sampled off the route only, so every candidate is solvable
+  on_route = np.zeros((count, size, size), dtype=bool)
+  starts = np.zeros((count, 2), dtype=np.int16)
+  goals = np.zeros((count, 2), dtype=np.int16)
+  for i, route in enumerate(routes):
+    xs, ys = zip(*route)
+    on_route[i, ys, xs] = True
+    goals[i] = route[-1]
+  target_obstacles = density * (size * size - on_route.sum(axis=(1, 2)))
+
+  levels = []
+  chunk = max(1, CONSTANTS.CURRICULUM_BATCH // candidates)
+  for first in range(0, count, chunk):
+    last = min(count, first + chunk)
+    routes_mask = np.repeat(on_route[first:last], candidates, axis=0)
+    # Spread candidate densities around the target so some land on it
+    rates = rng.uniform(0.5 * density, min(1.0, 1.5 * density + 0.1), size=(len(routes_mask), 1, 1))
+    blocked = (rng.random(routes_mask.shape) < rates) & ~routes_mask
+    batch_starts = np.repeat(starts[first:last], candidates, axis=0)
+    batch_goals = np.repeat(goals[first:last], candidates, axis=0)
+    measured_par, measured_turns = measure(blocked, batch_starts, batch_goals)
+    batch_targets = np.repeat(targets[first:last], candidates, axis=0)
+    batch_obstacles = np.repeat(target_obstacles[first:last], candidates)
+
+    error = (4 * np.abs(measured_par - batch_targets[:, 0]) + 2 * np.abs(measured_turns - batch_targets[:, 1]) +
+             np.abs(blocked.sum(axis=(1, 2)) - batch_obstacles) / size)
+    best = error.reshape(last - first, candidates).argmin(axis=1) + np.arange(0, len(error), candidates)
+    for index in best:
+      ys, xs = np.nonzero(blocked[index])
+      path = Path(size, [0, 0], batch_goals[index].tolist(), list(zip(xs.tolist(), ys.tolist())))
+      path.difficulty = int(measured_par[index] + measured_turns[index])
+      levels.append(path)
+  return levels
+
+def curriculum(count, size=None, density=0.3, seed=None):
+  # Graded levels from short straight runs up to long winding routes, in
+  # order of difficulty
+  size = size or CONSTANTS.GRID_SIZE
+  rng = np.random.default_rng(seed)
+  longest = 2 * (size - 1)
+  targets = [(par, turns) for par in range(1, longest + 1) for turns in range(min(par, size))]
+  targets.sort(key=lambda target: (target[0] + target[1], target))
+  levels = []
+  for number, (par, turns) in enumerate(targets):
+    share = count * (number + 1) // len(targets) - count * number // len(targets)
+    if share:
+      levels += generate_levels(share, par, turns, density, size, seed=rng.integers(1 << 32))
+  levels.sort(key=lambda path: path.difficulty)
+  return levels
@@ -0,0 +1,71 @@
+import math
+
+import pygame
+
+from utils.colors import COLORS
+
+class Display:
+  # The game is laid out and drawn once, at its native size, onto a canvas.
+  # present() scales only the regions that changed up to the window, which
+  # can be any size; the whole canvas is rescaled only when the window is.
+  # Enlarging uses whole-number factors, so every canvas pixel lands on the
+  # same block of window pixels whichever region it is scaled with.
+  def __init__(self, size, window_size=None):
+    self.size = tuple(size)
+    self.window = pygame.display.set_mode(window_size or self.size, pygame.RESIZABLE)
+    self.canvas = pygame.Surface(self.size).convert()
+    self.layout()
+
+  def layout(self):
+    # Largest uniform scale that fits, centred with bars on the sides
+    width, height = self.window.get_size()
+    fit = max(min(width / self.size[0], height / self.size[1]), 1 / min(self.size))
+    self.scale = math.floor(fit) if fit >= 1 else fit
+    scaled = (round(self.size[0] * self.scale), round(self.size[1] * self.scale))
+    self.view = pygame.Rect(((width - scaled[0]) // 2, (height - scaled[1]) // 2), scaled)
+
+  @property
+  def native(self):
+    return self.view.size == self.size
+
+  def resize(self):
+    # Called once per batch of resize events, however many arrived
+    self.window = pygame.display.get_surface()
+    self.layout()
+    self.window.fill(COLORS.BLACK)
+    self.present([self.canvas.get_rect()], update=False)
+    pygame.display.flip()
+
+  def to_window(self, rect):
+    left = math.floor(rect.left * self.scale)
+    top = math.floor(rect.top * self.scale)
+    right = math.ceil(rect.right * self.scale)
+    bottom = math.ceil(rect.bottom * self.scale)
+    return pygame.Rect(self.view.x + left, self.view.y + top, right - left, bottom - top)
+
+  def to_logical(self, pos):
+    # Window pixel -> canvas pixel, for hit-testing
+    return (math.floor((pos[0] - self.view.x) / self.scale), math.floor((pos[1] - self.view.y) / self.scale))
+
+  def present(self, dirty, update=True):
+    if not dirty:
+      return
+    if self.scale < 1:
+      # Shrunk below the layout size the whole frame is cheap to filter
+      self.window.blit(pygame.transform.smoothscale(self.canvas, self.view.size), self.view)
+      targets = [self.view]
+    else:
+      bounds = self.canvas.get_rect()
+      targets = []
+      for rect in dirty:
+        rect = rect.clip(bounds)
+        if not rect.width or not rect.height:
+          continue
+        target = self.to_window(rect)
+        if self.native:
+          self.window.blit(self.canvas, target, rect)
+        else:
+          self.window.blit(pygame.transform.scale(self.canvas.subsurface(rect), target.size), target)
+        targets.append(target)
+    if update:
+      pygame.display.update(targets)
@@ -1,93 +1,118 @@
 import sys
+from time import perf_counter
+
 import pygame
 
+from classes.camera import Camera
+from classes.display import Display
+from classes.hints import HintEngine
+from classes.levels import LevelStream, endless_paths
 from classes.state import GameState
 from classes.panel import CommandPanel
+from classes.profiler import FrameProfiler, WAIT, EVENTS, UPDATE, DRAW, PRESENT
+from classes.renderer import Renderer, draw_board, draw_player, draw_panel, draw_commands
+from classes.simulation import Simulation
+from classes.text import render_text
 from utils.constants import CONSTANTS
 from utils.colors import COLORS
-# Initialize Pygame
-pygame.init()
-
-WINDOW_WIDTH = CONSTANTS.CELL_SIZE * CONSTANTS.GRID_SIZE
-WINDOW_HEIGHT = CONSTANTS.CELL_SIZE * CONSTANTS.GRID_SIZE + CONSTANTS.COMMAND_PANEL_HEIGHT
-SCREEN = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Toddler Programming Game")
-
-def draw_game(screen, game_state, command_panel):
+# The window shows a fixed viewport of the board, whatever its size
+WINDOW_WIDTH = CONSTANTS.CELL_SIZE * CONSTANTS.VIEWPORT_SIZE
+WINDOW_HEIGHT = CONSTANTS.CELL_SIZE * CONSTANTS.VIEWPORT_SIZE + CONSTANTS.COMMAND_PANEL_HEIGHT
+# Posted by the simulation thread whenever it publishes a new snapshot
+SIMULATION_EVENT = pygame.USEREVENT + 1
+
+def open_window(scale=1):
+  # Only the display is brought up, and only once a window is needed;
+  # fonts initialize on first use and the mixer is never started.
+  pygame.display.init()
+  display = Display((WINDOW_WIDTH, WINDOW_HEIGHT), (round(WINDOW_WIDTH * scale), round(WINDOW_HEIGHT * scale)))
+  pygame.display.set_caption("Toddler Programming Game")
+  return display
+
+def draw_game(screen, game_state, command_panel, camera=None):
+  if camera is None:
+    camera = Camera()
+    camera.follow(game_state.player_pos, game_state.current_path.size)
   screen.fill(COLORS.WHITE)
-    
-  # Draw grid
-  for x in range(CONSTANTS.GRID_SIZE):
-    for y in range(CONSTANTS.GRID_SIZE):
-      pygame.draw.rect(screen, COLORS.BLACK, 
-                          (x * CONSTANTS.CELL_SIZE, 
-                           y * CONSTANTS.CELL_SIZE, 
-                           CONSTANTS.CELL_SIZE, 
-                           CONSTANTS.CELL_SIZE), 1)
-
-  # Draw obstacles
-  for obstacle in game_state.current_path.obstacles:
-    pygame.draw.rect(screen, COLORS.RED,
-                      (obstacle[0] * CONSTANTS.CELL_SIZE, 
-                       obstacle[1] * CONSTANTS.CELL_SIZE, 
-                        CONSTANTS.CELL_SIZE, 
-                        CONSTANTS.CELL_SIZE))
-
-  # Draw goal
-  pygame.draw.rect(screen, COLORS.GREEN,
-                  (game_state.current_path.goal_pos[0] * CONSTANTS.CELL_SIZE, 
-                    game_state.current_path.goal_pos[1] * CONSTANTS.CELL_SIZE,
-                    CONSTANTS.CELL_SIZE, 
-                    CONSTANTS.CELL_SIZE))
-
-  # Draw player
-  pygame.draw.circle(screen, COLORS.BLUE,
-                    (game_state.player_pos[0] * CONSTANTS.CELL_SIZE + CONSTANTS.CELL_SIZE//2,
-                      game_state.player_pos[1] * CONSTANTS.CELL_SIZE + CONSTANTS.CELL_SIZE//2),
-                    CONSTANTS.CELL_SIZE//3)
-
-  # Draw direction buttons (images)
-  for button in command_panel.direction_buttons.values():
-    screen.blit(button.image, button.rect)
-
-  # Draw play button (image)
-  screen.blit(command_panel.play_button.image, command_panel.play_button.rect)
-
-  # Draw color buttons
-  for button, color in command_panel.color_buttons:
-    pygame.draw.rect(screen, color, button)
-    pygame.draw.rect(screen, COLORS.BLACK, button, 2)
-
-  # Draw command sequence
-  x_start = 10
-  y = WINDOW_HEIGHT - 40
-  for command in game_state.commands:
-    pygame.draw.circle(screen, command.color, (x_start + 15, y), 15)
-    # Load and draw the corresponding direction image for the command
-    direction_img = command_panel.direction_buttons[command.direction].image
-    small_direction_img = pygame.transform.scale(direction_img, (30, 30))
-    screen.blit(small_direction_img, (x_start, y - 15))
-    x_start += 40
-
-def game():
-  game_state = GameState()
-  command_panel = CommandPanel(CONSTANTS.GRID_SIZE * CONSTANTS.CELL_SIZE)
-  clock = pygame.time.Clock()
+  draw_board(screen, game_state.current_path, camera)
+  draw_player(screen, game_state.player_pos, camera)
+  draw_panel(screen, command_panel)
+  draw_commands(screen, game_state, command_panel)
+
+def next_events(timeout):
+  # Sleep until input arrives or the timeout expires, then drain the queue
+  return [pygame.event.wait(timeout)] + pygame.event.get()
+
+def wake_render():
+  # Called from the simulation thread; posting events is thread-safe
+  pygame.event.post(pygame.event.Event(SIMULATION_EVENT))
+
+def quit_game():
+  pygame.quit()
+  sys.exit()
+
+def wait_for_level(display, levels):
+  # Large boards take a while to generate; keep the window responsive and
+  # say so instead of freezing until the first one is ready
+  canvas = display.canvas
+  text = render_text("Generating level...", 36, COLORS.BLACK)
+  canvas.fill(COLORS.WHITE)
+  canvas.blit(text, text.get_rect(center=canvas.get_rect().center))
+  display.present([canvas.get_rect()])
+  while not levels.ready():
+    for event in next_events(CONSTANTS.FRAME_MS):
+      if event.type == pygame.QUIT:
+        quit_game()
+      if event.type == pygame.VIDEORESIZE:
+        display.resize()
+
+def game(grid_size=None, profile_path=None, telemetry=None, scale=1):
+  display = open_window(scale)
+  levels = LevelStream(endless_paths(grid_size))
+  wait_for_level(display, levels)
+  game_state = GameState(levels)
+  if telemetry:
+    telemetry.attach(game_state)
+  hints = HintEngine(game_state.current_path)
+  game_state.listeners.append(hints.on_event)
+  # Game logic runs on its own clock; this loop only handles input and draws
+  simulation = Simulation(game_state, hints, on_publish=wake_render)
+  simulation.start()
+  command_panel = CommandPanel(CONSTANTS.VIEWPORT_SIZE * CONSTANTS.CELL_SIZE)
+  renderer = Renderer(display.canvas, command_panel)
+  profiler = FrameProfiler()
   selected_color = COLORS.BLUE
-  
+
   while True:
-    for event in pygame.event.get():
+    profiler.begin()
+    # Draw every frame while the player slides between cells; otherwise
+    # sleep until input arrives or the simulation publishes a change
+    state = simulation.snapshot
+    timeout = CONSTANTS.FRAME_MS if state.animating(perf_counter()) else CONSTANTS.IDLE_TIMEOUT_MS
+    events = next_events(timeout)
+    profiler.mark(WAIT)
+
+    resized = False
+    for event in events:
       if event.type == pygame.QUIT:
-        pygame.quit()
-        sys.exit()
+        simulation.stop()
+        if profile_path:
+          profiler.dump(profile_path)
+        if telemetry:
+          telemetry.close()
+        quit_game()
         
-      if event.type == pygame.MOUSEBUTTONDOWN and not game_state.is_playing:
-        mouse_pos = pygame.mouse.get_pos()
+      if event.type == pygame.VIDEORESIZE:
+        resized = True
+
+      if event.type == pygame.MOUSEBUTTONDOWN and not state.is_playing:
+        # Buttons are laid out on the canvas, not in window pixels
+        mouse_pos = display.to_logical(event.pos)
             
         # Check direction buttons
         for direction, button in command_panel.direction_buttons.items():
           if button.rect.collidepoint(mouse_pos):
-            game_state.add_command(direction, selected_color)
+            simulation.send(GameState.add_command, direction, selected_color)
 
         # Check color buttons
         for button, color in command_panel.color_buttons:
@@ -96,32 +121,50 @@ def game():
 
         # Check play button
         if command_panel.play_button.rect.collidepoint(mouse_pos):
-          game_state.is_playing = True
+          simulation.send(GameState.play)
 
       if event.type == pygame.KEYDOWN:
         if event.key == pygame.K_r:  # Reset game
-          game_state.reset()
+          simulation.send(GameState.reset)
         elif event.key == pygame.K_n:  # Next path
-          game_state.next_path()
-
-    # Update game state
-    if game_state.is_playing:
-      game_state.animation_timer += 1
-      if game_state.animation_timer >= 30:
-        game_state.execute_next_command()
-        game_state.animation_timer = 0
-
-    # Draw game state
-    draw_game(SCREEN, game_state, command_panel)
-
-    # Display win/lose messages
-    if game_state.game_won or game_state.game_lost:
-        font = pygame.font.Font(None, 36)
-        if game_state.game_won:
-            text = font.render("You Win!", True, COLORS.GREEN)
-        else:
-            text = font.render("Try Again! ", True, COLORS.RED)
-        SCREEN.blit(text, (WINDOW_WIDTH//4, WINDOW_HEIGHT//2))
-
-    pygame.display.flip()
-    clock.tick(30)
\ No newline at end of file
+          simulation.send(GameState.next_path)
+        elif event.key == pygame.K_p:  # Previous path
+          simulation.send(GameState.previous_path)
+        elif event.key == pygame.K_f and state.commands:  # Skip to the result
+          simulation.send(GameState.fast_forward)
+        elif event.key == pygame.K_BACKSPACE and not state.is_playing:  # Undo the last command
+          simulation.send(GameState.remove_command)
+        elif event.key == pygame.K_LEFT and state.commands:  # Scrub the run
+          simulation.send(GameState.step_back)
+        elif event.key == pygame.K_RIGHT and state.commands:
+          simulation.send(GameState.step_forward)
+        elif event.key == pygame.K_HOME and state.commands:
+          simulation.send(GameState.rewind)
+        elif event.key == pygame.K_RIGHTBRACKET:  # Playback speed
+          simulation.send(lambda game_state: game_state.set_speed(game_state.speed * 2))
+        elif event.key == pygame.K_LEFTBRACKET:
+          simulation.send(lambda game_state: game_state.set_speed(game_state.speed / 2))
+        elif event.key == pygame.K_h:  # Show or hide hints
+          renderer.show_hints = not renderer.show_hints
+        elif event.key == pygame.K_F3:  # Frame timing overlay
+          profiler.visible = not profiler.visible
+          if not profiler.visible:
+            renderer.invalidate()
+        elif event.key == pygame.K_F4:  # Save frame timings
+          profiler.dump(profile_path or CONSTANTS.PROFILE_FILE)
+    if resized:
+      display.resize()
+    profiler.mark(EVENTS)
+
+    # Pick up the latest state the simulation has published
+    state = simulation.snapshot
+    profiler.mark(UPDATE)
+
+    # Draw only what changed since the last frame
+    dirty = renderer.render(state, state.position_at(perf_counter()))
+    if profiler.visible:
+      dirty.append(renderer.draw_overlay(state, profiler.overlay()))
+    profiler.mark(DRAW)
+    display.present(dirty)
+    profiler.mark(PRESENT)
+    profiler.end()
@@ -0,0 +1,85 @@
+from classes.path import UNREACHABLE
+from utils.cells import CELLS
+from utils.directions import Direction, DELTAS
+
+
+class HintEngine:
+  # Follows the program while it is being built. positions[i] is where the
+  # player stands after i commands, so appending or removing a command is a
+  # single simulated step, and the next move is read off the path's goal
+  # distance field instead of searching again.
+  def __init__(self, path):
+    self.set_path(path)
+
+  def set_path(self, path):
+    self.path = path
+    self.positions = [tuple(path.start_pos)]
+    self.crash = None  # index of the command that leaves the board or hits an obstacle
+    self.win = None    # index of the command that reaches the goal
+
+  def append(self, direction):
+    index = len(self.positions) - 1
+    position = self.positions[-1]
+    if self.crash is None and self.win is None:
+      dx, dy = DELTAS[direction]
+      new_pos = (position[0] + dx, position[1] + dy)
+      if not self.path.in_bounds(new_pos) or self.path.cell(new_pos) == CELLS.OBSTACLE:
+        self.crash = index
+      else:
+        position = new_pos
+        if self.path.cell(new_pos) == CELLS.GOAL:
+          self.win = index
+    self.positions.append(position)
+
+  def remove(self):
+    if len(self.positions) == 1:
+      return
+    self.positions.pop()
+    index = len(self.positions) - 1
+    if self.crash == index:
+      self.crash = None
+    if self.win == index:
+      self.win = None
+
+  def sync(self, commands):
+    # Catches up with edits at the end of the program
+    while len(self.positions) - 1 > len(commands):
+      self.remove()
+    while len(self.positions) - 1 < len(commands):
+      self.append(commands[len(self.positions) - 1].direction)
+
+  def on_event(self, event, game_state):
+    # GameState listener
+    if game_state.current_path is not self.path:
+      self.set_path(game_state.current_path)
+    self.sync(game_state.commands)
+
+  @property
+  def position(self):
+    return self.positions[-1]
+
+  @property
+  def next_move(self):
+    # A direction that gets one step closer to the goal, or None once the
+    # program has already won or crashed
+    if self.crash is not None or self.win is not None:
+      return None
+    x, y = self.position
+    distance = self.path.distance_from(self.position)
+    if distance == UNREACHABLE:
+      return None
+    for direction in Direction:
+      dx, dy = DELTAS[direction]
+      neighbor = (x + dx, y + dy)
+      if self.path.in_bounds(neighbor) and self.path.distance_from(neighbor) == distance - 1:
+        return direction
+    return None
+
+  @property
+  def moves_left(self):
+    # Shortest number of commands still needed to win
+    if self.win is not None:
+      return 0
+    if self.crash is not None:
+      return UNREACHABLE
+    return self.path.distance_from(self.position)
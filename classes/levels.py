@@ -0,0 +1,38 @@
+import queue
+import threading
+
+from classes.path import Path
+from utils.constants import CONSTANTS
+
+def endless_paths(size=None):
+  while True:
+    yield Path(size)
+
+class LevelStream:
+  # Endless iterator of levels, generated ahead of play by a background
+  # worker into a bounded queue so asking for the next one never waits.
+  def __init__(self, source=None, prefetch=CONSTANTS.PREFETCH_LEVELS):
+    self.source = source if source is not None else endless_paths()
+    self.queue = queue.Queue(maxsize=prefetch)
+    self.worker = threading.Thread(target=self.fill, daemon=True)
+    self.worker.start()
+
+  def fill(self):
+    for path in self.source:
+      self.queue.put(path)
+    # Finite sources end with a sentinel
+    self.queue.put(None)
+
+  def ready(self):
+    # Whether a level is waiting, so next() would not block
+    return not self.queue.empty()
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    path = self.queue.get()
+    if path is None:
+      self.queue.put(None)
+      raise StopIteration
+    return path
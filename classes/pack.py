@@ -0,0 +1,113 @@
+import mmap
+import struct
+
+from classes.path import Path, UNREACHABLE
+from utils.constants import CONSTANTS
+
+# Largest board a record can describe: sizes and coordinates are single bytes
+MAX_GRID_LIMIT = 255
+
+# Level pack layout:
+#   header, fixed-size level records, index of record numbers sorted by
+#   (difficulty, par). Opening a pack reads only the header; levels are
+#   unpacked from the memory map when asked for.
+MAGIC = b"MEWP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIQ")  # magic, version, grid limit, mask bytes, record size, count, index offset
+RECORD = "<BBBBBHH{}s"                # size, start x/y, goal x/y, par, difficulty, obstacle bitmask
+
+def record_format(grid_limit):
+  mask_bytes = (grid_limit * grid_limit + 7) // 8
+  return struct.Struct(RECORD.format(mask_bytes)), mask_bytes
+
+class LevelPackWriter:
+  def __init__(self, filename, grid_limit=CONSTANTS.GRID_SIZE):
+    if not 1 <= grid_limit <= MAX_GRID_LIMIT:
+      raise ValueError(f"grid limit must be between 1 and {MAX_GRID_LIMIT}")
+    self.file = open(filename, "wb")
+    self.grid_limit = grid_limit
+    self.record, self.mask_bytes = record_format(grid_limit)
+    self.keys = []
+    # Placeholder header, rewritten with the final counts on close
+    self.file.write(HEADER.pack(MAGIC, VERSION, grid_limit, self.mask_bytes, self.record.size, 0, 0))
+
+  def add(self, path):
+    if path.size > self.grid_limit:
+      raise ValueError(f"grid size {path.size} exceeds pack limit {self.grid_limit}")
+    if path.par == UNREACHABLE:
+      # Par is stored unsigned; a pack only holds levels that can be won
+      raise ValueError("cannot pack a level whose goal is unreachable")
+    difficulty = path.difficulty if path.difficulty is not None else path.par
+    self.file.write(self.record.pack(path.size, *path.start_pos, *path.goal_pos, path.par, difficulty,
+                                     path.obstacle_mask.to_bytes(self.mask_bytes, "little")))
+    self.keys.append((difficulty, path.par, len(self.keys)))
+
+  def close(self):
+    index_offset = self.file.tell()
+    numbers = [number for _, _, number in sorted(self.keys)]
+    self.file.write(struct.pack(f"<{len(numbers)}I", *numbers))
+    self.file.seek(0)
+    self.file.write(HEADER.pack(MAGIC, VERSION, self.grid_limit, self.mask_bytes, self.record.size,
+                                len(self.keys), index_offset))
+    self.file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+def write_pack(filename, levels, grid_limit=CONSTANTS.GRID_SIZE):
+  # Streams any iterable of Paths into a pack without holding them
+  with LevelPackWriter(filename, grid_limit) as writer:
+    for path in levels:
+      writer.add(path)
+  return len(writer.keys)
+
+class LevelPack:
+  def __init__(self, filename):
+    with open(filename, "rb") as file:
+      self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, self.grid_limit, mask_bytes, record_size, self.count, self.index_offset = \
+      HEADER.unpack_from(self.data, 0)
+    if magic != MAGIC or version != VERSION:
+      raise ValueError(f"{filename} is not a version {VERSION} level pack")
+    self.record, _ = record_format(self.grid_limit)
+    if self.record.size != record_size:
+      raise ValueError(f"{filename} has unexpected record size {record_size}")
+
+  def __len__(self):
+    return self.count
+
+  def metadata(self, number):
+    # (size, start, goal, par, difficulty) without building the Path
+    if not 0 <= number < self.count:
+      raise IndexError(number)
+    size, sx, sy, gx, gy, par, difficulty, _ = \
+      self.record.unpack_from(self.data, HEADER.size + number * self.record.size)
+    return size, [sx, sy], [gx, gy], par, difficulty
+
+  def __getitem__(self, number):
+    if number < 0:
+      number += self.count
+    if not 0 <= number < self.count:
+      raise IndexError(number)
+    size, sx, sy, gx, gy, _, difficulty, mask = \
+      self.record.unpack_from(self.data, HEADER.size + number * self.record.size)
+    path = Path.from_mask(size, [sx, sy], [gx, gy], int.from_bytes(mask, "little"))
+    path.difficulty = difficulty
+    return path
+
+  def __iter__(self):
+    for number in range(self.count):
+      yield self[number]
+
+  def by_difficulty(self, rank):
+    # rank-th easiest level, through the sorted index
+    if not 0 <= rank < self.count:
+      raise IndexError(rank)
+    number, = struct.unpack_from("<I", self.data, self.index_offset + rank * 4)
+    return self[number]
+
+  def close(self):
+    self.data.close()
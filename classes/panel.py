@@ -1,34 +1,44 @@
 import pygame
 
+from classes.assets import AssetManager
 from classes.buttons import ButtonImage
+from classes.strip import CommandStrip
 from utils.directions import Direction
 from utils.constants import CONSTANTS
 from utils.colors import COLORS
 
-WINDOW_WIDTH = CONSTANTS.CELL_SIZE * CONSTANTS.GRID_SIZE
-WINDOW_HEIGHT = CONSTANTS.CELL_SIZE * CONSTANTS.GRID_SIZE + CONSTANTS.COMMAND_PANEL_HEIGHT
+WINDOW_WIDTH = CONSTANTS.CELL_SIZE * CONSTANTS.VIEWPORT_SIZE
+WINDOW_HEIGHT = CONSTANTS.CELL_SIZE * CONSTANTS.VIEWPORT_SIZE + CONSTANTS.COMMAND_PANEL_HEIGHT
 
 class CommandPanel:
-  def __init__(self, y_position):
+  def __init__(self, y_position, assets=None):
     self.y_position = y_position
-    self.button_size = 50
+    self.button_size = CONSTANTS.BUTTON_SIZE
     self.spacing = 10
-    # Load direction button images
+    self.assets = assets or AssetManager()
+    # Direction button images come from the shared atlas
     self.direction_buttons = {}
     for direction in Direction:
-      image_path = f"./assets/{direction.value}.svg"  # e.g., "up.svg", "down.svg", etc.
-      button = ButtonImage(image_path, (self.button_size, self.button_size))
+      button = ButtonImage(self.assets.image(direction.value, self.button_size))
       x_start = 10 + (len(self.direction_buttons) * (self.button_size + self.spacing))
       button.set_position(x_start, y_position + 10)
       self.direction_buttons[direction] = button
 
     # Load play button
-    self.play_button = ButtonImage("./assets/play.png", (40, 40))
+    self.play_button = ButtonImage(self.assets.image("play", CONSTANTS.PLAY_BUTTON_SIZE))
     self.play_button.set_position(WINDOW_WIDTH - 60, y_position + 10)
 
     # Create color buttons (these remain as rectangles)
     self.color_buttons = self.create_color_buttons()
 
+    # Command sequence strip along the bottom of the window
+    self.command_strip = CommandStrip(pygame.Rect(0, WINDOW_HEIGHT - 55, WINDOW_WIDTH, CONSTANTS.CHIP_SIZE),
+                                      self.assets, [color for _, color in self.color_buttons])
+
+  def direction_buttons_rect(self):
+    buttons = [button.rect for button in self.direction_buttons.values()]
+    return buttons[0].unionall(buttons[1:])
+
   def create_color_buttons(self):
     buttons = []
     x_start = 10
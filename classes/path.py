@@ -1,25 +1,203 @@
 import random
+from collections import deque
+from utils.cells import CELLS
 from utils.constants import CONSTANTS
+from utils.directions import DELTAS
+
+UNREACHABLE = -1
+
+# Occupancy byte -> 1 where the player can stand, for bytes.translate
+PASSABLE = bytes(0 if cell == CELLS.OBSTACLE else 1 for cell in range(256))
+
+def distance_field(size, goal, occupancy):
+  # Shortest move count from every cell to the goal, indexed y*size+x.
+  # The search runs on a copy of the board with a blank row above and
+  # below and a blank column on the right, so every neighbour is a fixed
+  # offset away and stepping off an edge lands on a cell that is never free.
+  width = size + 1
+  free = bytearray(width)
+  for y in range(size):
+    free += occupancy[y * size:(y + 1) * size].translate(PASSABLE) + b"\0"
+  free += bytearray(width)
+  distances = [UNREACHABLE] * len(free)
+  goal = (goal[1] + 1) * width + goal[0]
+  free[goal] = 0
+  distances[goal] = 0
+  frontier = [goal]
+  step = 0
+  while frontier:
+    step += 1
+    following = []
+    for index in frontier:
+      for neighbour in (index + 1, index - 1, index + width, index - width):
+        if free[neighbour]:
+          free[neighbour] = 0
+          distances[neighbour] = step
+          following.append(neighbour)
+    frontier = following
+  result = []
+  for y in range(1, size + 1):
+    result += distances[y * width:y * width + size]
+  return result
 
 class Path:
-  def __init__(self):
-    self.start_pos = [0, 0]
+  def __init__(self, size=None, start_pos=None, goal_pos=None, obstacles=None):
+    self.size = size or CONSTANTS.GRID_SIZE
+    self.start_pos = list(start_pos) if start_pos is not None else [0, 0]
     self.goal_pos = None
-    self.obstacles = []
-    self.generate_path()
+    # One cell type per square, indexed y*size+x
+    self.occupancy = bytearray(self.size * self.size)
+    self.distances = []
+    # Set by generators and level packs that grade their levels
+    self.difficulty = None
+    self._obstacles = None
+    if goal_pos is None:
+      self.generate_path()
+    else:
+      self.set_layout(goal_pos, obstacles or [])
+
+  @classmethod
+  def from_mask(cls, size, start_pos, goal_pos, mask):
+    # Obstacles given as an integer with bit y*size+x set per obstacle
+    obstacles = []
+    while mask:
+      index = (mask & -mask).bit_length() - 1
+      obstacles.append([index % size, index // size])
+      mask &= mask - 1
+    return cls(size, start_pos, goal_pos, obstacles)
+
+  def set_layout(self, goal_pos, obstacles):
+    self.goal_pos = list(goal_pos)
+    self.occupancy = bytearray(self.size * self.size)
+    for obstacle in obstacles:
+      self.occupancy[self.index(obstacle)] = CELLS.OBSTACLE
+    self.occupancy[self.index(self.start_pos)] = CELLS.START
+    self.occupancy[self.index(self.goal_pos)] = CELLS.GOAL
+    self._obstacles = None
+    self.distances = distance_field(self.size, self.goal_pos, self.occupancy)
 
   def generate_path(self):
+    if self.size < 4:
+      raise ValueError("generated boards must be at least 4 cells across")
     # Generate a random goal position
-    self.goal_pos = [random.randint(3, CONSTANTS.GRID_SIZE-1), random.randint(3, CONSTANTS.GRID_SIZE-1)]
-    
-    # Generate obstacles avoiding the path
-    self.obstacles = []
-    possible_positions = [(x, y) for x in range(CONSTANTS.GRID_SIZE) for y in range(CONSTANTS.GRID_SIZE)]
-    possible_positions.remove((self.start_pos[0], self.start_pos[1]))
-    possible_positions.remove((self.goal_pos[0], self.goal_pos[1]))
-    
-    for _ in range(random.randint(3, 5)):
-      if possible_positions:
-        pos = random.choice(possible_positions)
-        self.obstacles.append([pos[0], pos[1]])
-        possible_positions.remove(pos)
\ No newline at end of file
+    self.goal_pos = [random.randint(3, self.size-1), random.randint(3, self.size-1)]
+    self.occupancy = bytearray(self.size * self.size)
+    self.occupancy[self.index(self.start_pos)] = CELLS.START
+    self.occupancy[self.index(self.goal_pos)] = CELLS.GOAL
+    self._obstacles = None
+
+    # Generate obstacles avoiding the path, scaled with the board area
+    area = self.size * self.size
+    count = random.randint(3, 5) * max(1, area // (CONSTANTS.GRID_SIZE * CONSTANTS.GRID_SIZE))
+    route = self.route(distance_field(self.size, self.goal_pos, self.occupancy))
+    rejected = set()
+    remaining = area - 2
+
+    for _ in range(count):
+      # Skip candidates that would cut the start off from the goal. Only
+      # cells on the current start-goal route can do that, and those look
+      # for a local detour before falling back to a full search.
+      while remaining:
+        index = random.randrange(area)
+        if self.occupancy[index] != CELLS.EMPTY or index in rejected:
+          continue
+        remaining -= 1
+        self.occupancy[index] = CELLS.OBSTACLE
+        if index not in route:
+          break
+        detour = self.detour(route, index)
+        if detour is not None:
+          route = detour
+          break
+        distances = distance_field(self.size, self.goal_pos, self.occupancy)
+        if distances[self.index(self.start_pos)] != UNREACHABLE:
+          route = self.route(distances)
+          break
+        self.occupancy[index] = CELLS.EMPTY
+        rejected.add(index)
+
+    self.distances = distance_field(self.size, self.goal_pos, self.occupancy)
+
+  def route(self, distances):
+    # One shortest route from the start to the goal, as cell index -> step
+    x, y = self.start_pos
+    cells = [self.index(self.start_pos)]
+    while distances[y * self.size + x] > 0:
+      for dx, dy in DELTAS.values():
+        nx, ny = x + dx, y + dy
+        if (0 <= nx < self.size and 0 <= ny < self.size and
+            distances[ny * self.size + nx] == distances[y * self.size + x] - 1):
+          x, y = nx, ny
+          break
+      cells.append(y * self.size + x)
+    return {cell: step for step, cell in enumerate(cells)}
+
+  def detour(self, route, blocked):
+    # Bounded search around a newly blocked route cell, rejoining the route
+    # further along; returns the patched route or None if nothing was found
+    cells = sorted(route, key=route.get)
+    step = route[blocked]
+    came_from = {cells[step - 1]: None}
+    queue = deque([cells[step - 1]])
+    while queue and len(came_from) < CONSTANTS.DETOUR_LIMIT:
+      index = queue.popleft()
+      x, y = index % self.size, index // self.size
+      for dx, dy in DELTAS.values():
+        nx, ny = x + dx, y + dy
+        if not (0 <= nx < self.size and 0 <= ny < self.size):
+          continue
+        neighbour = ny * self.size + nx
+        if (neighbour in came_from or self.occupancy[neighbour] == CELLS.OBSTACLE or
+            route.get(neighbour, step) < step):
+          continue
+        came_from[neighbour] = index
+        if route.get(neighbour, -1) > step:
+          bridge = []
+          while neighbour is not None:
+            bridge.append(neighbour)
+            neighbour = came_from[neighbour]
+          # The bridge ends where the old route resumes
+          cells = cells[:step - 1] + bridge[::-1] + cells[route[bridge[0]] + 1:]
+          return {cell: number for number, cell in enumerate(cells)}
+        queue.append(neighbour)
+    return None
+
+  @property
+  def obstacles(self):
+    # List view for the renderer, derived from the occupancy grid
+    if self._obstacles is None:
+      self._obstacles = [[index % self.size, index // self.size]
+                         for index, cell in enumerate(self.occupancy)
+                         if cell == CELLS.OBSTACLE]
+    return self._obstacles
+
+  @property
+  def obstacle_mask(self):
+    mask = 0
+    for index, cell in enumerate(self.occupancy):
+      if cell == CELLS.OBSTACLE:
+        mask |= 1 << index
+    return mask
+
+  def index(self, pos):
+    return pos[1] * self.size + pos[0]
+
+  def in_bounds(self, pos):
+    return 0 <= pos[0] < self.size and 0 <= pos[1] < self.size
+
+  def cell(self, pos):
+    return self.occupancy[pos[1] * self.size + pos[0]]
+
+  def is_blocked(self, pos):
+    return self.cell(pos) == CELLS.OBSTACLE
+
+  def distance_from(self, pos):
+    return self.distances[self.index(pos)]
+
+  @property
+  def par(self):
+    return self.distance_from(self.start_pos)
+
+  @property
+  def is_solvable(self):
+    return self.par != UNREACHABLE
@@ -0,0 +1,84 @@
+import csv
+import json
+from array import array
+from time import perf_counter
+
+import pygame
+
+from classes.text import render_text
+from utils.colors import COLORS
+from utils.constants import CONSTANTS
+
+# Phases of one pass through the game loop, in order
+PHASES = ("wait", "events", "update", "draw", "present")
+WAIT, EVENTS, UPDATE, DRAW, PRESENT = range(len(PHASES))
+
+def percentile(values, fraction):
+  if not values:
+    return 0.0
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class FrameProfiler:
+  # Ring buffer of per-phase timestamps. Each frame owns one fixed slot of
+  # len(PHASES) + 1 doubles: the frame start, then the end of each phase.
+  def __init__(self, capacity=CONSTANTS.PROFILE_FRAMES):
+    self.capacity = capacity
+    self.width = len(PHASES) + 1
+    self.stamps = array("d", [0.0]) * (capacity * self.width)
+    self.frame = 0
+    self.base = 0
+    self.visible = False
+
+  def begin(self):
+    self.base = (self.frame % self.capacity) * self.width
+    self.stamps[self.base] = perf_counter()
+
+  def mark(self, phase):
+    self.stamps[self.base + 1 + phase] = perf_counter()
+
+  def end(self):
+    self.frame += 1
+
+  def frames(self):
+    # Per-phase durations in milliseconds, oldest frame first
+    count = min(self.frame, self.capacity)
+    first = self.frame - count
+    for number in range(first, self.frame):
+      base = (number % self.capacity) * self.width
+      stamps = self.stamps[base:base + self.width]
+      yield [(stamps[i + 1] - stamps[i]) * 1000 for i in range(len(PHASES))]
+
+  def summary(self):
+    frames = list(self.frames())
+    # Frame time is the work done per frame, leaving out idle waiting
+    work = [sum(phases[1:]) for phases in frames]
+    return {
+      "frames": len(frames),
+      "frame_ms": {name: percentile(work, fraction)
+                   for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))},
+      "phase_ms": {name: sum(phases[i] for phases in frames) / max(1, len(frames))
+                   for i, name in enumerate(PHASES)},
+    }
+
+  def dump(self, filename):
+    if filename.endswith(".csv"):
+      with open(filename, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow([f"{name}_ms" for name in PHASES])
+        writer.writerows(self.frames())
+    else:
+      with open(filename, "w") as file:
+        json.dump({"phases": PHASES, "summary": self.summary(), "frames": list(self.frames())}, file)
+
+  def overlay(self):
+    # Small text panel with frame time percentiles and the phase breakdown
+    summary = self.summary()
+    lines = ["frame " + " ".join(f"{name} {ms:.1f}" for name, ms in summary["frame_ms"].items())]
+    lines += [f"{name:8s}{ms:7.2f} ms" for name, ms in summary["phase_ms"].items()]
+    rendered = [render_text(line, 18, COLORS.BLACK) for line in lines]
+    surface = pygame.Surface((max(text.get_width() for text in rendered) + 8, 16 * len(rendered) + 8))
+    surface.fill(COLORS.YELLOW)
+    for row, text in enumerate(rendered):
+      surface.blit(text, (4, 4 + 16 * row))
+    return surface
@@ -0,0 +1,202 @@
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+from classes.camera import Camera
+from classes.text import render_text
+from utils.cells import CELLS
+from utils.constants import CONSTANTS
+from utils.colors import COLORS
+
+# Cell colors and whether grid lines show, indexed by cell type
+PALETTE = np.zeros((4, 3), dtype=np.uint8)
+PALETTE[[CELLS.EMPTY, CELLS.START]] = COLORS.WHITE
+PALETTE[CELLS.OBSTACLE] = COLORS.RED
+PALETTE[CELLS.GOAL] = COLORS.GREEN
+OPEN = np.zeros(4, dtype=bool)
+OPEN[[CELLS.EMPTY, CELLS.START]] = True
+
+# One-pixel outline of a single cell
+_edge = np.zeros(CONSTANTS.CELL_SIZE, dtype=bool)
+_edge[[0, -1]] = True
+CELL_OUTLINE = _edge[:, None] | _edge[None, :]
+
+@lru_cache(maxsize=8)
+def outline_mask(shape):
+  # Cell outlines tiled over a whole viewport, reused between redraws
+  return np.tile(CELL_OUTLINE, shape)
+
+def cell_rect(pos, camera=None):
+  x, y = camera.to_screen(pos) if camera else (pos[0] * CONSTANTS.CELL_SIZE, pos[1] * CONSTANTS.CELL_SIZE)
+  return pygame.Rect(x, y, CONSTANTS.CELL_SIZE, CONSTANTS.CELL_SIZE)
+
+def board_surface(path, camera):
+  # Visible cells only, expanded from the cell-type array to pixels
+  columns, rows = camera.cells(path.size)
+  cells = np.frombuffer(path.occupancy, dtype=np.uint8).reshape(path.size, path.size)
+  cells = cells[rows.start:rows.stop, columns.start:columns.stop].T
+  pixels = PALETTE[cells].repeat(CONSTANTS.CELL_SIZE, axis=0).repeat(CONSTANTS.CELL_SIZE, axis=1)
+  lines = OPEN[cells].repeat(CONSTANTS.CELL_SIZE, axis=0).repeat(CONSTANTS.CELL_SIZE, axis=1)
+  lines &= outline_mask(cells.shape)
+  pixels[lines] = COLORS.BLACK
+  return pygame.surfarray.make_surface(pixels)
+
+def draw_board(screen, path, camera=None):
+  # Draw grid, obstacles and goal for the part of the board in view
+  screen.blit(board_surface(path, camera or Camera()), (0, 0))
+
+def draw_player(screen, pos, camera=None):
+  pygame.draw.circle(screen, COLORS.BLUE, cell_rect(pos, camera).center, CONSTANTS.CELL_SIZE//3)
+
+def draw_panel(screen, command_panel):
+  # Draw direction buttons (images)
+  for button in command_panel.direction_buttons.values():
+    screen.blit(button.image, button.rect)
+
+  # Draw play button (image)
+  screen.blit(command_panel.play_button.image, command_panel.play_button.rect)
+
+  # Draw color buttons
+  for button, color in command_panel.color_buttons:
+    pygame.draw.rect(screen, color, button)
+    pygame.draw.rect(screen, COLORS.BLACK, button, 2)
+
+def draw_commands(screen, game_state, command_panel, marked=None):
+  # Draw the visible part of the command sequence
+  command_panel.command_strip.draw(screen, game_state, marked)
+
+def draw_hint(screen, command_panel, hint):
+  # Outline the suggested direction button
+  direction, _ = hint
+  if direction is not None:
+    pygame.draw.rect(screen, COLORS.GREEN, command_panel.direction_buttons[direction].rect, 3)
+
+def hint_rect(command_panel):
+  return command_panel.direction_buttons_rect().union(command_panel.command_strip.rect)
+
+def draw_message(screen, game_state):
+  # Display win/lose messages
+  if game_state.game_won:
+    text = render_text("You Win!", 36, COLORS.GREEN)
+  else:
+    text = render_text("Try Again! ", 36, COLORS.RED)
+  position = (screen.get_width()//4, screen.get_height()//2)
+  screen.blit(text, position)
+  return text.get_rect(topleft=position)
+
+class Renderer:
+  # Keeps the grid, obstacles, goal and panel in a cached background and
+  # only pushes the regions that changed since the last frame.
+  def __init__(self, screen, command_panel):
+    self.screen = screen
+    self.command_panel = command_panel
+    self.background = pygame.Surface(screen.get_size())
+    self.board_view = None
+    self.camera = Camera()
+    self.revision = None
+    self.player_pos = None
+    self.strip_view = None
+    self.message_rect = None
+    self.overlay_rect = None
+    # Hints come from the state's next_move and crash when shown
+    self.show_hints = False
+    self.hint_view = None
+
+  def invalidate(self):
+    # Next frame redraws the whole window
+    self.revision = None
+    self.overlay_rect = None
+
+  def rebuild(self, path):
+    self.background.fill(COLORS.WHITE)
+    draw_board(self.background, path, self.camera)
+    draw_panel(self.background, self.command_panel)
+    self.board_view = (path, self.camera.x, self.camera.y)
+
+  def hint(self, game_state):
+    # Suggested direction and crashing command, while the program is edited
+    if not self.show_hints or game_state.is_playing:
+      return None
+    return (game_state.next_move, game_state.crash)
+
+  def draw_commands(self, game_state, hint):
+    draw_commands(self.screen, game_state, self.command_panel, hint and hint[1])
+    if hint:
+      draw_hint(self.screen, self.command_panel, hint)
+
+  def render(self, game_state, player_pos=None):
+    # player_pos, when given, is where to draw the player between cells;
+    # the camera still follows the cell the state says it is on
+    player_pos = tuple(player_pos or game_state.player_pos)
+    # Scrolling the view means redrawing the board
+    scrolled = self.camera.follow(game_state.player_pos, game_state.current_path.size)
+    finished = game_state.game_won or game_state.game_lost
+    # Scrubbing back from the end takes the message away again
+    if game_state.revision != self.revision or scrolled or (self.message_rect and not finished):
+      return self.render_full(game_state, player_pos)
+
+    dirty = []
+    strip_dirty = False
+    if player_pos != self.player_pos:
+      dirty += [cell_rect(self.player_pos, self.camera), cell_rect(player_pos, self.camera)]
+      self.player_pos = player_pos
+    strip = self.command_panel.command_strip
+    strip_view = strip.view(game_state)
+    if strip_view != self.strip_view:
+      dirty.append(strip.rect)
+      self.strip_view = strip_view
+      strip_dirty = True
+    hint = self.hint(game_state)
+    if hint != self.hint_view:
+      dirty.append(hint_rect(self.command_panel))
+      self.hint_view = hint
+      strip_dirty = True
+    if not dirty and finished == (self.message_rect is not None):
+      return []
+
+    for rect in dirty:
+      self.screen.blit(self.background, rect, rect)
+    draw_player(self.screen, player_pos, self.camera)
+    if strip_dirty:
+      self.draw_commands(game_state, hint)
+    if finished:
+      if self.message_rect is None:
+        self.message_rect = draw_message(self.screen, game_state)
+        dirty.append(self.message_rect)
+      elif self.message_rect.collidelist(dirty) != -1:
+        draw_message(self.screen, game_state)
+    return dirty
+
+  def render_full(self, game_state, player_pos=None):
+    player_pos = tuple(player_pos or game_state.player_pos)
+    self.camera.follow(game_state.player_pos, game_state.current_path.size)
+    if (game_state.current_path, self.camera.x, self.camera.y) != self.board_view:
+      self.rebuild(game_state.current_path)
+    self.screen.blit(self.background, (0, 0))
+    draw_player(self.screen, player_pos, self.camera)
+    self.hint_view = self.hint(game_state)
+    self.draw_commands(game_state, self.hint_view)
+    self.message_rect = None
+    if game_state.game_won or game_state.game_lost:
+      self.message_rect = draw_message(self.screen, game_state)
+
+    self.revision = game_state.revision
+    self.player_pos = player_pos
+    self.strip_view = self.command_panel.command_strip.view(game_state)
+    return [self.screen.get_rect()]
+
+  def draw_overlay(self, game_state, overlay):
+    # Transient panel in the top-left corner, drawn over everything else
+    rect = overlay.get_rect(topleft=(4, 4))
+    area = rect.union(self.overlay_rect) if self.overlay_rect else rect
+    self.screen.blit(self.background, area, area)
+    if cell_rect(self.player_pos, self.camera).colliderect(area):
+      draw_player(self.screen, self.player_pos, self.camera)
+    if hint_rect(self.command_panel).colliderect(area):
+      self.draw_commands(game_state, self.hint_view)
+    if self.message_rect and self.message_rect.colliderect(area):
+      draw_message(self.screen, game_state)
+    self.screen.blit(overlay, rect)
+    self.overlay_rect = rect
+    return area
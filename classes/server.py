@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import logging
+import math
+import multiprocessing
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from classes.path import Path
+from classes.state import GameState
+from utils.colors import COLORS
+from utils.constants import CONSTANTS
+from utils.directions import Direction
+
+# Requests are three bytes: opcode and two arguments
+REQUEST = struct.Struct("!BBB")
+OP_ADD = 1        # direction code, color index
+OP_PLAY = 2
+OP_RESET = 3
+OP_NEXT = 4
+OP_PREVIOUS = 5
+OP_STATE = 6      # resend everything
+
+# Replies are framed as type, payload length, payload
+FRAME = struct.Struct("!BH")
+MSG_LEVEL = 1     # size, start x/y, goal x/y, obstacle bitmask
+MSG_DIFF = 2      # field mask, then only the fields that changed
+LEVEL = struct.Struct("!HHHHH")
+# Largest board whose level frame fits the 16-bit payload length
+MAX_GRID_SIZE = math.isqrt((0xFFFF - LEVEL.size) * 8)
+
+# Diff fields, in payload order
+FIELD_POS = 1           # x, y
+FIELD_COMMAND = 2       # index of the next command
+FIELD_COMMAND_COUNT = 4
+FIELD_FLAGS = 8         # playing, won, lost bits
+FIELDS = [(FIELD_POS, struct.Struct("!HH")), (FIELD_COMMAND, struct.Struct("!H")),
+          (FIELD_COMMAND_COUNT, struct.Struct("!H")), (FIELD_FLAGS, struct.Struct("!B"))]
+FLAG_PLAYING, FLAG_WON, FLAG_LOST = 1, 2, 4
+
+DIRECTIONS = list(Direction)
+log = logging.getLogger(__name__)
+
+PALETTE = [COLORS.RED, COLORS.BLUE, COLORS.GREEN, COLORS.YELLOW, COLORS.PURPLE, COLORS.ORANGE]
+
+def frame(kind, payload):
+  return FRAME.pack(kind, len(payload)) + payload
+
+def encode_level(path):
+  mask = path.obstacle_mask.to_bytes((path.size * path.size + 7) // 8, "big")
+  return frame(MSG_LEVEL, LEVEL.pack(path.size, *path.start_pos, *path.goal_pos) + mask)
+
+def decode_level(payload):
+  size, sx, sy, gx, gy = LEVEL.unpack_from(payload)
+  return Path.from_mask(size, [sx, sy], [gx, gy], int.from_bytes(payload[LEVEL.size:], "big"))
+
+def state_fields(state):
+  flags = (FLAG_PLAYING * state.is_playing) | (FLAG_WON * state.game_won) | (FLAG_LOST * state.game_lost)
+  return {FIELD_POS: tuple(state.player_pos), FIELD_COMMAND: (state.current_command,),
+          FIELD_COMMAND_COUNT: (len(state.commands),), FIELD_FLAGS: (flags,)}
+
+def encode_diff(old, new):
+  mask = 0
+  payload = b""
+  for field, layout in FIELDS:
+    if old.get(field) != new[field]:
+      mask |= field
+      payload += layout.pack(*new[field])
+  return frame(MSG_DIFF, bytes([mask]) + payload) if mask else b""
+
+def decode_diff(payload):
+  mask = payload[0]
+  offset = 1
+  fields = {}
+  for field, layout in FIELDS:
+    if mask & field:
+      fields[field] = layout.unpack_from(payload, offset)
+      offset += layout.size
+  return fields
+
+
+class Session:
+  def __init__(self, writer, first_level):
+    self.writer = writer
+    # Levels are generated off the event loop and queued here before the
+    # GameState asks for them
+    self.upcoming = deque([first_level])
+    self.state = GameState(self.levels())
+    self.sent_path = None
+    self.sent = {}
+
+  def levels(self):
+    while True:
+      yield self.upcoming.popleft()
+
+  @property
+  def needs_level(self):
+    # Whether moving to the next level would leave the played history
+    state = self.state
+    return not self.upcoming and state.history_index + 1 == len(state.history)
+
+  def flush(self):
+    # Sends the level if it changed and a diff of everything else
+    data = b""
+    if self.state.current_path is not self.sent_path:
+      data += encode_level(self.state.current_path)
+      self.sent_path = self.state.current_path
+    fields = state_fields(self.state)
+    data += encode_diff(self.sent, fields)
+    self.sent = fields
+    if data:
+      self.writer.write(data)
+
+
+class GameServer:
+  # Hosts many GameState sessions in one event loop. Playing sessions are
+  # advanced together on one shared tick; idle ones cost nothing.
+  def __init__(self, grid_size=None, tick_ms=CONSTANTS.COMMAND_INTERVAL_MS, workers=None):
+    if grid_size is not None and not 4 <= grid_size <= MAX_GRID_SIZE:
+      raise ValueError(f"grid size must be between 4 and {MAX_GRID_SIZE}")
+    self.grid_size = grid_size
+    self.tick_ms = tick_ms
+    self.sessions = set()
+    self.playing = set()
+    # Levels are built in worker processes, started on first use. They are
+    # spawned rather than forked so they never inherit client sockets,
+    # which would keep a connection open after its session ends.
+    self.pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+  def apply(self, session, op, arg1, arg2):
+    state = session.state
+    # Programs are capped so the command count fits its 16-bit field
+    if (op == OP_ADD and not state.is_playing and arg1 < len(DIRECTIONS) and arg2 < len(PALETTE) and
+        len(state.commands) < CONSTANTS.SERVER_MAX_COMMANDS):
+      state.add_command(DIRECTIONS[arg1], PALETTE[arg2])
+    elif op == OP_PLAY and state.commands and not (state.game_won or state.game_lost):
+      state.play()
+      self.playing.add(session)
+    elif op == OP_RESET:
+      state.reset()
+    elif op == OP_NEXT:
+      state.next_path()
+    elif op == OP_PREVIOUS:
+      state.previous_path()
+    elif op == OP_STATE:
+      session.sent_path = None
+      session.sent = {}
+    if not state.is_playing:
+      self.playing.discard(session)
+
+  def tick(self):
+    # One batch step for every session with a running program
+    for session in list(self.playing):
+      session.state.execute_next_command()
+      if not session.state.is_playing:
+        self.playing.discard(session)
+      session.flush()
+
+  async def run_ticks(self):
+    while True:
+      await asyncio.sleep(self.tick_ms / 1000)
+      self.tick()
+
+  async def generate_level(self):
+    # Large boards take a while to build; a worker process builds them so
+    # the shared tick keeps running for every other session meanwhile
+    return await asyncio.get_running_loop().run_in_executor(self.pool, Path, self.grid_size)
+
+  async def handle(self, reader, writer):
+    session = Session(writer, await self.generate_level())
+    self.sessions.add(session)
+    session.flush()
+    try:
+      while True:
+        op, arg1, arg2 = REQUEST.unpack(await reader.readexactly(REQUEST.size))
+        if op == OP_NEXT and session.needs_level:
+          session.upcoming.append(await self.generate_level())
+        self.apply(session, op, arg1, arg2)
+        session.flush()
+        if writer.transport.get_write_buffer_size() > CONSTANTS.SERVER_WRITE_LIMIT:
+          break  # client stopped reading
+        await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+      pass
+    except (struct.error, ValueError):
+      log.exception("dropping session after a protocol error")
+    finally:
+      self.sessions.discard(session)
+      self.playing.discard(session)
+      writer.close()
+
+  async def serve(self, host="127.0.0.1", port=CONSTANTS.SERVER_PORT, unix_path=None):
+    if unix_path:
+      server = await asyncio.start_unix_server(self.handle, unix_path)
+    else:
+      server = await asyncio.start_server(self.handle, host, port)
+    try:
+      async with server:
+        await asyncio.gather(server.serve_forever(), self.run_ticks())
+    finally:
+      self.close()
+
+  def close(self):
+    self.pool.shutdown(cancel_futures=True)
+
+
+class GameClient:
+  # Minimal client for the socket protocol; keeps a local mirror of its
+  # session so it can stand in for a real thin client in tests.
+  def __init__(self, reader, writer):
+    self.reader = reader
+    self.writer = writer
+    self.path = None
+    self.fields = {}
+
+  @classmethod
+  async def connect(cls, host="127.0.0.1", port=CONSTANTS.SERVER_PORT, unix_path=None):
+    if unix_path:
+      reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+      reader, writer = await asyncio.open_connection(host, port)
+    return cls(reader, writer)
+
+  def send(self, op, arg1=0, arg2=0):
+    self.writer.write(REQUEST.pack(op, arg1, arg2))
+
+  def add_command(self, direction, color_index=0):
+    self.send(OP_ADD, DIRECTIONS.index(direction), color_index)
+
+  def play(self):
+    self.send(OP_PLAY)
+
+  def reset(self):
+    self.send(OP_RESET)
+
+  def next_level(self):
+    self.send(OP_NEXT)
+
+  def previous_level(self):
+    self.send(OP_PREVIOUS)
+
+  def request_state(self):
+    self.send(OP_STATE)
+
+  async def receive(self):
+    # Reads one frame and applies it to the mirror
+    kind, length = FRAME.unpack(await self.reader.readexactly(FRAME.size))
+    payload = await self.reader.readexactly(length)
+    if kind == MSG_LEVEL:
+      self.path = decode_level(payload)
+    elif kind == MSG_DIFF:
+      self.fields.update(decode_diff(payload))
+    return kind
+
+  @property
+  def player_pos(self):
+    return list(self.fields.get(FIELD_POS, ()))
+
+  @property
+  def flags(self):
+    return self.fields.get(FIELD_FLAGS, (0,))[0]
+
+  async def close(self):
+    self.writer.close()
+    await self.writer.wait_closed()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Host many game sessions over a local socket")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=CONSTANTS.SERVER_PORT)
+  parser.add_argument("--unix", metavar="PATH", default=None, help="listen on a Unix socket instead")
+  parser.add_argument("--grid-size", type=int, default=None)
+  args = parser.parse_args()
+  asyncio.run(GameServer(args.grid_size).serve(args.host, args.port, args.unix))
@@ -0,0 +1,153 @@
+import threading
+from collections import deque
+from dataclasses import dataclass
+from time import perf_counter, sleep
+
+from utils.constants import CONSTANTS
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    # Everything the render loop reads, under the same names as GameState
+    revision: int
+    current_path: object
+    commands: tuple
+    current_command: int
+    player_pos: tuple
+    is_playing: bool
+    game_won: bool
+    game_lost: bool
+    next_move: object
+    crash: object
+    # The run being played back or scrubbed, None while editing
+    trajectory: object
+    # Where the player moved from, when, and how long the move animates
+    previous_pos: tuple
+    moved_at: float
+    move_seconds: float
+
+    def progress(self, now):
+        if self.move_seconds <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - self.moved_at) / self.move_seconds))
+
+    def animating(self, now):
+        return self.progress(now) < 1.0
+
+    def position_at(self, now):
+        # Player position eased between cells for drawing
+        t = self.progress(now)
+        return tuple(a + (b - a) * t for a, b in zip(self.previous_pos, self.player_pos))
+
+
+class Simulation:
+  # Runs a GameState on its own fixed-timestep clock, on its own thread. The
+  # render loop never touches the GameState: inputs go in through a deque and
+  # state comes out as immutable snapshots written to the back of two slots,
+  # after which the front index flips. Neither side takes a lock.
+  def __init__(self, game_state, hints=None, tick_ms=CONSTANTS.SIMULATION_TICK_MS, on_publish=None):
+    self.game_state = game_state
+    self.hints = hints
+    self.tick_ms = tick_ms
+    self.on_publish = on_publish
+    self.inputs = deque()
+    self.wakeup = threading.Event()
+    self.buffers = [None, None]
+    self.front = 0
+    self.running = False
+    self.thread = None
+    self.commands = ()
+    self.commands_changed = True
+    self.position = tuple(game_state.player_pos)
+    self.previous_pos = self.position
+    self.moved_at = perf_counter()
+    self.published = None
+    game_state.listeners.append(self.on_event)
+    self.publish()
+
+  @property
+  def snapshot(self):
+    return self.buffers[self.front]
+
+  def on_event(self, event, game_state):
+    if event in ("add_command", "remove_command", "reset"):
+      self.commands_changed = True
+
+  def send(self, action, *args):
+    # Queues action(game_state, *args) for the next tick
+    self.inputs.append((action, args))
+    self.wakeup.set()
+
+  def tick(self):
+    # One fixed step: apply inputs, advance the clock, publish
+    state = self.game_state
+    while self.inputs:
+      action, args = self.inputs.popleft()
+      action(state, *args)
+    if state.is_playing:
+      state.animation_timer += self.tick_ms
+      if state.animation_timer >= state.command_interval:
+        # Carry the remainder so command timing does not drift
+        carry = state.animation_timer - state.command_interval
+        state.execute_next_command()
+        state.animation_timer = carry
+    self.publish()
+
+  def publish(self):
+    state = self.game_state
+    position = tuple(state.player_pos)
+    if position != self.position:
+      # Single steps of a run slide across; anything else jumps
+      step = abs(position[0] - self.position[0]) + abs(position[1] - self.position[1])
+      self.previous_pos = self.position if step == 1 else position
+      self.position = position
+      self.moved_at = perf_counter()
+    if self.commands_changed:
+      self.commands = tuple(state.commands)
+      self.commands_changed = False
+    hint = (self.hints.next_move, self.hints.crash) if self.hints else (None, None)
+    key = (state.revision, state.current_path, self.commands, state.current_command, position,
+           state.is_playing, state.game_won, state.game_lost, hint, state.trajectory, self.moved_at)
+    if self.published is not None and all(a is b or a == b for a, b in zip(key, self.published)):
+      return
+    self.published = key
+    back = 1 - self.front
+    self.buffers[back] = Snapshot(state.revision, state.current_path, self.commands, state.current_command,
+                                  position, state.is_playing, state.game_won, state.game_lost, *hint,
+                                  state.trajectory, self.previous_pos, self.moved_at,
+                                  min(CONSTANTS.MOVE_ANIMATION_MS, state.command_interval) / 1000)
+    self.front = back
+    if self.on_publish:
+      self.on_publish()
+
+  def run(self):
+    tick_seconds = self.tick_ms / 1000
+    clock = perf_counter()
+    while self.running:
+      if not self.game_state.is_playing and not self.inputs:
+        # Nothing is running: sleep until there is input
+        self.wakeup.wait()
+        self.wakeup.clear()
+        clock = perf_counter()
+        continue
+      # Catch up on every tick that is due, however long a frame took
+      now = perf_counter()
+      ticks = 0
+      while clock <= now and ticks < CONSTANTS.SIMULATION_MAX_CATCHUP:
+        self.tick()
+        clock += tick_seconds
+        ticks += 1
+      if clock <= now:
+        clock = now
+      sleep(max(0.0, clock - perf_counter()))
+
+  def start(self):
+    self.running = True
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    self.running = False
+    self.wakeup.set()
+    if self.thread:
+      self.thread.join()
@@ -1,7 +1,8 @@
+from collections import deque
 from dataclasses import dataclass
-from classes.path import Path
+from classes.levels import LevelStream
+from classes.trajectory import Trajectory
 from utils.colors import COLORS
-from utils.directions import Direction
 from utils.constants import CONSTANTS
 
 
@@ -11,10 +12,13 @@ class Command:
     color: tuple
 
 class GameState:
-  def __init__(self):
-    self.paths = self.generate_paths()
-    self.current_path_index = 0
-    self.current_path = self.paths[self.current_path_index]
+  def __init__(self, levels=None):
+    # Any iterable of Paths; by default an endless prefetched stream
+    self.levels = iter(levels) if levels is not None else LevelStream()
+    # Recently played levels, so earlier boards can be revisited
+    self.history = deque([next(self.levels)], maxlen=CONSTANTS.LEVEL_HISTORY)
+    self.history_index = 0
+    self.current_path = self.history[0]
     self.player_pos = self.current_path.start_pos.copy()
     self.commands = []
     self.current_command = 0
@@ -22,16 +26,41 @@ class GameState:
     self.game_won = False
     self.game_lost = False
     self.animation_timer = 0
+    # Precomputed run of the current program, built when it starts playing
+    self.trajectory = None
+    # Playback speed multiplier
+    self.speed = 1.0
+    # Bumped whenever the board is reset so renderers know to redraw it
+    self.revision = 0
     self.available_colors = [COLORS.RED, COLORS.BLUE, COLORS.GREEN, COLORS.YELLOW, COLORS.PURPLE, COLORS.ORANGE]
+    # Callables told about gameplay as listener(event, game_state)
+    self.listeners = []
 
-  def generate_paths(self):
-    return [Path() for _ in range(5)]
+  def notify(self, event):
+    for listener in self.listeners:
+      listener(event, self)
 
   def next_path(self):
-    self.current_path_index = (self.current_path_index + 1) % len(self.paths)
-    self.current_path = self.paths[self.current_path_index]
+    if self.history_index + 1 < len(self.history):
+      self.history_index += 1
+    else:
+      path = next(self.levels, None)
+      if path is not None:
+        self.history.append(path)
+        self.history_index = len(self.history) - 1
+    self.current_path = self.history[self.history_index]
+    self.reset()
+    self.notify("level")
+
+  def previous_path(self):
+    if self.history_index > 0:
+      self.history_index -= 1
+    self.current_path = self.history[self.history_index]
     self.reset()
+    self.notify("level")
+
   def reset(self):
+    self.revision += 1
     self.player_pos = self.current_path.start_pos.copy()
     self.commands = []
     self.current_command = 0
@@ -39,41 +68,74 @@ class GameState:
     self.game_won = False
     self.game_lost = False
     self.animation_timer = 0
+    self.trajectory = None
+    self.notify("reset")
 
   def add_command(self, direction, color):
     self.commands.append(Command(direction, color))
+    self.trajectory = None
+    self.notify("add_command")
+
+  def remove_command(self):
+    if self.commands:
+      self.commands.pop()
+      self.trajectory = None
+      self.notify("remove_command")
+
+  def compute_trajectory(self):
+    if self.trajectory is None:
+      self.trajectory = Trajectory(self.commands, self.current_path)
+    return self.trajectory
+
+  def play(self):
+    # Simulates the whole program once; playback then only indexes into it
+    trajectory = self.compute_trajectory()
+    if self.current_command >= trajectory.length:
+      self.seek(0)
+    self.is_playing = trajectory.length > 0
+
+  def seek(self, step):
+    # Jumps to the state after `step` commands in constant time
+    trajectory = self.trajectory or self.compute_trajectory()
+    step = max(0, min(step, trajectory.length))
+    finished = step == trajectory.length
+    self.current_command = step
+    self.player_pos = trajectory.position(step)
+    self.game_won = finished and trajectory.won
+    self.game_lost = finished and trajectory.lost
+    if finished:
+      self.is_playing = False
+    self.animation_timer = 0
+
+  def step_back(self):
+    self.is_playing = False
+    self.seek(self.current_command - 1)
+    self.notify("seek")
+
+  def step_forward(self):
+    self.is_playing = False
+    self.seek(self.current_command + 1)
+    self.notify("seek")
+
+  def rewind(self):
+    self.is_playing = False
+    self.seek(0)
+    self.notify("seek")
+
+  def set_speed(self, speed):
+    self.speed = max(1 / CONSTANTS.MAX_SPEED, min(speed, CONSTANTS.MAX_SPEED))
+
+  @property
+  def command_interval(self):
+    return CONSTANTS.COMMAND_INTERVAL_MS / self.speed
+
   def execute_next_command(self):
-    if self.current_command >= len(self.commands):
-        self.is_playing = False
-        return
-
-    command = self.commands[self.current_command]
-    new_pos = self.player_pos.copy()
-
-    if command.direction == Direction.UP:
-        new_pos[1] -= 1
-    elif command.direction == Direction.DOWN:
-        new_pos[1] += 1
-    elif command.direction == Direction.LEFT:
-        new_pos[0] -= 1
-    elif command.direction == Direction.RIGHT:
-        new_pos[0] += 1
-
-    # Check if move is valid
-    if (0 <= new_pos[0] < CONSTANTS.GRID_SIZE and 
-        0 <= new_pos[1] < CONSTANTS.GRID_SIZE and 
-        new_pos not in self.current_path.obstacles):
-        self.player_pos = new_pos
-        
-        # Check win/lose conditions
-        if self.player_pos == self.current_path.goal_pos:
-            self.game_won = True
-            self.is_playing = False
-        elif self.player_pos in self.current_path.obstacles:
-            self.game_lost = True
-            self.is_playing = False
-    else:
-        self.game_lost = True
-        self.is_playing = False
+    self.seek(self.current_command + 1)
+    self.notify("execute")
 
-    self.current_command += 1
+  def fast_forward(self):
+    # Jump to the end of the program in one call
+    if self.game_won or self.game_lost:
+      return
+    self.seek(self.compute_trajectory().length)
+    self.notify("execute")
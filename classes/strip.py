@@ -0,0 +1,68 @@
+import pygame
+
+from utils.colors import COLORS
+from utils.constants import CONSTANTS
+from utils.directions import Direction
+
+CHIP_PITCH = 40
+
+class CommandStrip:
+  # Scrolling view over the program; only the chips in view are blitted,
+  # so a long program costs the same per frame as a short one.
+  def __init__(self, rect, assets, colors):
+    self.rect = rect
+    self.assets = assets
+    self.chips = {}
+    for direction in Direction:
+      for color in colors:
+        self.chip(direction, color)
+    self.visible = max(1, (rect.width - 10 - CONSTANTS.CHIP_SIZE) // CHIP_PITCH + 1)
+    self.first = 0
+
+  def chip(self, direction, color):
+    key = (direction, color)
+    if key not in self.chips:
+      size = CONSTANTS.CHIP_SIZE
+      chip = pygame.Surface((size, size), pygame.SRCALPHA)
+      pygame.draw.circle(chip, color, (size//2, size//2), size//2)
+      chip.blit(self.assets.image(direction.value, size), (0, 0))
+      if pygame.display.get_surface() is not None:
+        chip = chip.convert_alpha()
+      self.chips[key] = chip
+    return self.chips[key]
+
+  def highlighted(self, game_state):
+    if game_state.is_playing:
+      return game_state.current_command
+    # Paused, scrubbed or finished: the last command that ran
+    if game_state.trajectory is not None and game_state.current_command > 0:
+      return game_state.current_command - 1
+    return None
+
+  def view(self, game_state):
+    # Scroll so the highlighted command, or the newest one while editing, is in view
+    count = len(game_state.commands)
+    current = self.highlighted(game_state)
+    focus = count - 1 if current is None else current
+    if focus < self.first:
+      self.first = max(0, focus)
+    elif focus >= self.first + self.visible:
+      self.first = focus - self.visible + 1
+    self.first = max(0, min(self.first, count - self.visible))
+    return (self.first, min(count, self.first + self.visible), current)
+
+  def draw(self, screen, game_state, marked=None):
+    # `marked` rings one more chip in red, e.g. the command that will crash
+    first, last, current = self.view(game_state)
+    x = self.rect.x + 10
+    y = self.rect.y
+    for index in range(first, last):
+      command = game_state.commands[index]
+      screen.blit(self.chip(command.direction, command.color), (x, y))
+      if index == current:
+        pygame.draw.circle(screen, COLORS.BLACK, (x + CONSTANTS.CHIP_SIZE//2, y + CONSTANTS.CHIP_SIZE//2),
+                           CONSTANTS.CHIP_SIZE//2, 2)
+      if index == marked:
+        pygame.draw.circle(screen, COLORS.RED, (x + CONSTANTS.CHIP_SIZE//2, y + CONSTANTS.CHIP_SIZE//2),
+                           CONSTANTS.CHIP_SIZE//2, 3)
+      x += CHIP_PITCH
@@ -0,0 +1,204 @@
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+from utils.constants import CONSTANTS
+from utils.directions import CODES
+from utils.outcomes import Outcome
+
+# Event kinds and what their two integer fields hold
+KIND_ADD = 1       # direction code, color index
+KIND_RUN = 2       # program length, -
+KIND_OUTCOME = 3   # Outcome, commands executed
+KIND_RESET = 4     # -, -
+KIND_LEVEL = 5     # par, grid size
+
+# What to do when the queue is full
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+
+# Append-only binary log record: time, kind, student, level, a, b
+RECORD = struct.Struct("<dB16sIii")
+
+def level_id(path):
+  return zlib.crc32(path.size.to_bytes(4, "little") + bytes(path.occupancy))
+
+
+class SQLiteSink:
+  def __init__(self, filename):
+    self.filename = filename
+    self.connection = None
+
+  def open(self):
+    # Called on the writer thread, which owns the connection
+    self.connection = sqlite3.connect(self.filename)
+    self.connection.execute("PRAGMA journal_mode=WAL")
+    self.connection.execute("PRAGMA synchronous=NORMAL")
+    self.connection.execute("CREATE TABLE IF NOT EXISTS events "
+                            "(time REAL, kind INTEGER, student TEXT, level INTEGER, a INTEGER, b INTEGER)")
+    self.connection.commit()
+
+  def write(self, batch):
+    with self.connection:
+      self.connection.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)", batch)
+
+  def close(self):
+    self.connection.close()
+
+
+class BinaryLogSink:
+  def __init__(self, filename):
+    self.filename = filename
+    self.file = None
+
+  def open(self):
+    self.file = open(self.filename, "ab")
+
+  def write(self, batch):
+    self.file.write(b"".join(RECORD.pack(stamp, kind, student.encode()[:16], level, a, b)
+                             for stamp, kind, student, level, a, b in batch))
+    self.file.flush()
+
+  def close(self):
+    self.file.close()
+
+def read_log(filename):
+  with open(filename, "rb") as file:
+    data = file.read()
+  for stamp, kind, student, level, a, b in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+    yield stamp, kind, student.rstrip(b"\0").decode(), level, a, b
+
+
+class Telemetry:
+  # Gameplay events go into a bounded deque (appends and pops are atomic,
+  # so the game loop never takes a lock) and a writer thread flushes them
+  # to the sink in batches.
+  def __init__(self, sink, student="", capacity=CONSTANTS.TELEMETRY_CAPACITY, policy=DROP_OLDEST,
+               batch_size=CONSTANTS.TELEMETRY_BATCH, flush_interval=CONSTANTS.TELEMETRY_FLUSH_S,
+               block_ms=CONSTANTS.TELEMETRY_BLOCK_MS):
+    self.sink = sink
+    self.student = student
+    self.capacity = capacity
+    self.policy = policy
+    self.batch_size = batch_size
+    self.flush_interval = flush_interval
+    self.block_ms = block_ms
+    # Hard cap whatever the policy; appending to a full deque drops its oldest
+    self.queue = deque(maxlen=capacity)
+    self.dropped = 0
+    self.wakeup = threading.Event()
+    self.space = threading.Event()
+    self.stopping = False
+    self.running = {}
+    # Last step each game state was seen at, to tell when scrubbing starts a run
+    self.steps = {}
+    self.level = (None, 0)
+    self.writer = threading.Thread(target=self.write_loop, daemon=True)
+    self.writer.start()
+
+  @classmethod
+  def open(cls, filename, **options):
+    sink = SQLiteSink(filename) if filename.endswith((".db", ".sqlite")) else BinaryLogSink(filename)
+    return cls(sink, **options)
+
+  def attach(self, game_state):
+    game_state.listeners.append(self.on_event)
+    self.record(KIND_LEVEL, game_state.current_path, game_state.current_path.par, game_state.current_path.size)
+
+  def record(self, kind, path, a=0, b=0):
+    if self.level[0] is not path:
+      self.level = (path, level_id(path))
+    event = (time.time(), kind, self.student, self.level[1], a, b)
+    if len(self.queue) >= self.capacity and self.policy == BLOCK:
+      # Back-pressure: give the writer a few milliseconds to make room
+      self.space.clear()
+      self.wakeup.set()
+      self.space.wait(self.block_ms / 1000)
+    if len(self.queue) >= self.capacity:
+      self.dropped += 1
+      if self.policy != DROP_OLDEST:
+        return
+    self.queue.append(event)
+    if len(self.queue) >= self.batch_size:
+      self.wakeup.set()
+
+  def on_event(self, event, game_state):
+    path = game_state.current_path
+    if event == "add_command":
+      command = game_state.commands[-1]
+      color = game_state.available_colors.index(command.color) if command.color in game_state.available_colors else -1
+      self.record(KIND_ADD, path, CODES[command.direction], color)
+    elif event in ("execute", "seek"):
+      # A run starts when the program is played, or stepped into from the
+      # start, and ends when its last step is reached
+      key = id(game_state)
+      stepped_in = self.steps.get(key, 0) == 0 and game_state.current_command == 1
+      self.steps[key] = game_state.current_command
+      if not self.running.get(key) and (event == "execute" or stepped_in):
+        self.running[key] = True
+        self.record(KIND_RUN, path, len(game_state.commands))
+      trajectory = game_state.trajectory
+      if (self.running.get(key) and not game_state.is_playing and
+          game_state.current_command == trajectory.length):
+        self.running[key] = False
+        self.record(KIND_OUTCOME, path, trajectory.outcome, game_state.current_command)
+    elif event == "reset":
+      self.running[id(game_state)] = False
+      self.steps[id(game_state)] = 0
+      self.record(KIND_RESET, path)
+    elif event == "level":
+      self.record(KIND_LEVEL, path, path.par, path.size)
+
+  def drain(self):
+    batch = []
+    while self.queue and len(batch) < self.batch_size:
+      batch.append(self.queue.popleft())
+    return batch
+
+  def write_loop(self):
+    self.sink.open()
+    while True:
+      self.wakeup.wait(self.flush_interval)
+      self.wakeup.clear()
+      batch = self.drain()
+      while batch:
+        self.sink.write(batch)
+        self.space.set()
+        batch = self.drain()
+      if self.stopping:
+        break
+    self.sink.close()
+
+  def close(self):
+    # Flushes what is queued and stops the writer
+    self.stopping = True
+    self.wakeup.set()
+    self.writer.join()
+
+
+def _summary(filename, key):
+  connection = sqlite3.connect(filename)
+  connection.row_factory = sqlite3.Row
+  try:
+    rows = connection.execute(f"""
+      SELECT {key},
+             SUM(kind = {KIND_RUN}) AS runs,
+             SUM(kind = {KIND_OUTCOME} AND a = {Outcome.WIN}) AS wins,
+             SUM(kind = {KIND_OUTCOME} AND a IN ({Outcome.OUT_OF_BOUNDS}, {Outcome.OBSTACLE})) AS losses,
+             SUM(kind = {KIND_ADD}) AS commands_added,
+             AVG(CASE WHEN kind = {KIND_OUTCOME} AND a = {Outcome.WIN} THEN b END) AS average_winning_steps
+      FROM events GROUP BY {key} ORDER BY {key}""").fetchall()
+    return [dict(row) for row in rows]
+  finally:
+    connection.close()
+
+def student_summary(filename):
+  # Runs, wins, losses and commands per student from a SQLite telemetry db
+  return _summary(filename, "student")
+
+def level_summary(filename):
+  return _summary(filename, "level")
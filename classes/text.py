@@ -0,0 +1,19 @@
+from functools import lru_cache
+
+import pygame
+
+@lru_cache(maxsize=None)
+def get_font(face, size):
+  if not pygame.font.get_init():
+    pygame.font.init()
+  return pygame.font.Font(face, size)
+
+@lru_cache(maxsize=256)
+def render_text(text, size, color, antialias=True, face=None):
+  # Shared surface, callers blit it and must not draw on it
+  return get_font(face, size).render(text, antialias, color)
+
+def clear_text_cache():
+  # Fonts die with pygame.font.quit(), so drop everything built on them
+  render_text.cache_clear()
+  get_font.cache_clear()
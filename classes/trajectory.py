@@ -0,0 +1,34 @@
+from array import array
+
+from classes.vm import VM, compile_program
+from utils.outcomes import Outcome
+
+
+class Trajectory:
+  # One run of a program, simulated once when it starts playing. Step k is
+  # the position after k moves, stored as interleaved x, y shorts, so
+  # playback and scrubbing index into it instead of simulating again.
+  def __init__(self, program, path, start_pos=None, subroutines=None):
+    # The program is compiled and stepped through the VM, so loops, calls
+    # and the instruction budget behave exactly as they do everywhere else
+    vm = VM(compile_program(program, subroutines), path, start_pos)
+    self.positions = array("h", vm.position)
+    moves = 0
+    while vm.running:
+      vm.step()
+      if vm.moves > moves:
+        moves = vm.moves
+        self.positions.extend(vm.position)
+    self.outcome = vm.outcome
+    self.length = vm.moves
+
+  def position(self, step):
+    return [self.positions[2 * step], self.positions[2 * step + 1]]
+
+  @property
+  def won(self):
+    return self.outcome == Outcome.WIN
+
+  @property
+  def lost(self):
+    return self.outcome in (Outcome.OUT_OF_BOUNDS, Outcome.OBSTACLE)
@@ -0,0 +1,155 @@
+from array import array
+from dataclasses import dataclass, field
+
+from utils.cells import CELLS
+from utils.constants import CONSTANTS
+from utils.directions import Direction, DELTAS, CODES
+from utils.outcomes import Outcome
+
+# Opcodes 0-3 are moves, using the direction codes
+OP_LOOP = 4   # operand: repeat count, pushes a loop counter
+OP_NEXT = 5   # operand: loop body start, jumps back while the counter lasts
+OP_CALL = 6   # operand: subroutine address
+OP_RET = 7
+OP_HALT = 8
+
+MOVES = [DELTAS[direction] for direction in Direction]
+
+
+@dataclass
+class Repeat:
+    count: int
+    body: list = field(default_factory=list)
+
+@dataclass
+class Call:
+    name: str
+
+
+class Compiler:
+  def __init__(self, subroutines):
+    self.subroutines = subroutines
+    self.code = array("i")
+    self.calls = []
+
+  def emit(self, *words):
+    self.code.extend(words)
+
+  def block(self, items):
+    for item in items:
+      if isinstance(item, Repeat):
+        if item.count <= 0 or not item.body:
+          continue
+        self.emit(OP_LOOP, item.count)
+        start = len(self.code)
+        self.block(item.body)
+        self.emit(OP_NEXT, start)
+      elif isinstance(item, Call):
+        if item.name not in self.subroutines:
+          raise ValueError(f"unknown subroutine {item.name!r}")
+        self.emit(OP_CALL, 0)
+        self.calls.append((len(self.code) - 1, item.name))
+      else:
+        self.code.append(CODES[getattr(item, "direction", item)])
+
+  def compile(self, program):
+    self.block(program)
+    self.emit(OP_HALT)
+    addresses = {}
+    for name, body in self.subroutines.items():
+      addresses[name] = len(self.code)
+      self.block(body)
+      self.emit(OP_RET)
+    for operand, name in self.calls:
+      self.code[operand] = addresses[name]
+    return self.code
+
+def compile_program(program, subroutines=None):
+  # Commands, Repeat blocks and Calls into subroutines -> flat bytecode
+  return Compiler(subroutines or {}).compile(program)
+
+
+class VM:
+  def __init__(self, code, path, start_pos=None, budget=CONSTANTS.VM_BUDGET):
+    self.code = code
+    self.path = path
+    self.size = path.size
+    self.occupancy = path.occupancy
+    self.budget = budget
+    self.pc = 0
+    self.stack = []
+    self.position = list(start_pos if start_pos is not None else path.start_pos)
+    self.moves = 0
+    self.executed = 0
+    self.outcome = None
+    # Dispatch table indexed by opcode
+    self.handlers = [self.move] * len(MOVES) + [self.loop, self.next, self.call, self.ret, self.halt]
+
+  @property
+  def running(self):
+    return self.outcome is None
+
+  def move(self, opcode):
+    self.pc += 1
+    dx, dy = MOVES[opcode]
+    x, y = self.position[0] + dx, self.position[1] + dy
+    self.moves += 1
+    size = self.size
+    if not (0 <= x < size and 0 <= y < size):
+      self.outcome = Outcome.OUT_OF_BOUNDS
+      return True
+    cell = self.occupancy[y * size + x]
+    if cell == CELLS.OBSTACLE:
+      self.outcome = Outcome.OBSTACLE
+    else:
+      self.position = [x, y]
+      if cell == CELLS.GOAL:
+        self.outcome = Outcome.WIN
+    return True
+
+  def loop(self, opcode):
+    self.stack.append(self.code[self.pc + 1])
+    self.pc += 2
+
+  def next(self, opcode):
+    self.stack[-1] -= 1
+    if self.stack[-1] > 0:
+      self.pc = self.code[self.pc + 1]
+    else:
+      self.stack.pop()
+      self.pc += 2
+
+  def call(self, opcode):
+    self.stack.append(self.pc + 2)
+    self.pc = self.code[self.pc + 1]
+
+  def ret(self, opcode):
+    self.pc = self.stack.pop()
+
+  def halt(self, opcode):
+    self.outcome = Outcome.OUT_OF_COMMANDS
+
+  def step(self):
+    # Runs up to and including the next move, for animation
+    code, handlers = self.code, self.handlers
+    while self.outcome is None:
+      if self.executed >= self.budget:
+        self.outcome = Outcome.BUDGET_EXCEEDED
+        break
+      self.executed += 1
+      opcode = code[self.pc]
+      if handlers[opcode](opcode):
+        break
+    return self.running
+
+  def run(self):
+    # Fast-forwards to the final state
+    code, handlers = self.code, self.handlers
+    while self.outcome is None:
+      if self.executed >= self.budget:
+        self.outcome = Outcome.BUDGET_EXCEEDED
+        break
+      self.executed += 1
+      opcode = code[self.pc]
+      handlers[opcode](opcode)
+    return self.outcome
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Tests run headless from the repository root
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def shortest_program():
+  # Builds a program that follows a path's goal distance field from the start
+  from utils.directions import DELTAS
+
+  def build(path):
+    pos = list(path.start_pos)
+    program = []
+    while path.distance_from(pos) > 0:
+      for direction, (dx, dy) in DELTAS.items():
+        step = [pos[0] + dx, pos[1] + dy]
+        if path.in_bounds(step) and path.distance_from(step) == path.distance_from(pos) - 1:
+          program.append(direction)
+          pos = step
+          break
+    return program
+  return build
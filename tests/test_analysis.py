@@ -0,0 +1,42 @@
+import itertools
+
+import numpy as np
+
+from classes.analysis import analyze, solutions
+from classes.batch import evaluate
+from classes.path import Path
+from utils.directions import Direction
+from utils.outcomes import Outcome
+
+LENGTH = 7
+
+
+def all_programs(length):
+  return np.array(list(itertools.product(range(4), repeat=length)), dtype=np.int8).reshape(-1, length)
+
+
+def test_counts_match_brute_force():
+  for path in [Path(size) for size in (4, 5, 6, 7) for _ in range(3)]:
+    stats = analyze(path, LENGTH)
+    result = evaluate(all_programs(LENGTH), [path])
+    outcome, steps = result.outcome[:, 0], result.steps[:, 0]
+    for step in range(1, LENGTH + 1):
+      # Every program sharing the first `step` commands ends the same way
+      tails = 4 ** (LENGTH - step)
+      assert stats.solutions[step] * tails == ((outcome == Outcome.WIN) & (steps == step)).sum()
+      assert stats.out_of_bounds[step] * tails == ((outcome == Outcome.OUT_OF_BOUNDS) & (steps == step)).sum()
+      assert stats.obstacle[step] * tails == ((outcome == Outcome.OBSTACLE) & (steps == step)).sum()
+    for length in range(1, LENGTH + 1):
+      assert stats.winning(length) == evaluate(all_programs(length), [path]).wins().sum()
+
+def test_solutions_are_exact_winning_programs():
+  directions = list(Direction)
+  for path in [Path(size) for size in (4, 5, 6) for _ in range(3)]:
+    found = {tuple(program) for program in solutions(path, LENGTH)}
+    expected = set()
+    for length in range(1, LENGTH + 1):
+      programs = all_programs(length)
+      result = evaluate(programs, [path])
+      exact = result.wins()[:, 0] & (result.steps[:, 0] == length)
+      expected |= {tuple(directions[code] for code in program) for program in programs[exact]}
+    assert found == expected
@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+
+from classes.batch import evaluate
+from classes.path import Path
+from classes.state import GameState
+from utils.colors import COLORS
+from utils.directions import Direction
+from utils.outcomes import Outcome
+
+
+def play_out(program, path):
+  # The interactive game, one command at a time
+  state = GameState([path])
+  for direction in program:
+    state.add_command(direction, COLORS.RED)
+  state.play()
+  while state.is_playing:
+    state.execute_next_command()
+  outcome = Outcome.WIN if state.game_won else state.trajectory.outcome
+  return outcome, state.player_pos, state.current_command, state.game_lost
+
+
+def test_matches_execute_next_command(shortest_program):
+  rng = random.Random(1)
+  paths = [Path(rng.randint(4, 9)) for _ in range(12)]
+  programs = [[rng.choice(list(Direction)) for _ in range(rng.randint(0, 16))] for _ in range(60)]
+  # Winning runs, with commands left over that must never be executed
+  programs += [shortest_program(path) + [rng.choice(list(Direction)) for _ in range(3)] for path in paths]
+  result = evaluate(programs, paths)
+  assert set(np.unique(result.outcome)) >= {Outcome.OUT_OF_COMMANDS, Outcome.WIN, Outcome.OUT_OF_BOUNDS,
+                                            Outcome.OBSTACLE}
+  for i, program in enumerate(programs):
+    for j, path in enumerate(paths):
+      outcome, position, steps, lost = play_out(program, path)
+      assert result.outcome[i, j] == outcome
+      assert result.final_pos[i, j].tolist() == position
+      assert result.steps[i, j] == steps
+      assert lost == (outcome in (Outcome.OUT_OF_BOUNDS, Outcome.OBSTACLE))
+
+def test_accepts_encoded_programs():
+  rng = np.random.default_rng(2)
+  paths = [Path(6) for _ in range(5)]
+  codes = rng.integers(0, 4, size=(30, 10), dtype=np.int8)
+  codes[::3, 7:] = -1
+  encoded = evaluate(codes, paths)
+  programs = [[list(Direction)[code] for code in row if code >= 0] for row in codes]
+  listed = evaluate(programs, paths)
+  assert (encoded.outcome == listed.outcome).all()
+  assert (encoded.final_pos == listed.final_pos).all()
+  assert (encoded.steps == listed.steps).all()
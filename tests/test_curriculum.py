@@ -0,0 +1,18 @@
+from classes.curriculum import generate_levels
+
+
+def test_no_levels_requested():
+  assert generate_levels(0, 5) == []
+
+def test_levels_are_built_to_the_target():
+  levels = generate_levels(20, 6, turns=2, size=6, seed=4)
+  assert len(levels) == 20
+  assert all(level.is_solvable for level in levels)
+  # Candidates are scored against the route's own target, which fits a 6x6 board
+  assert sum(level.par == 6 for level in levels) >= 15
+
+def test_unreachable_targets_are_eased_per_level():
+  # Nine moves with eight turns cannot fit on a 4x4 board
+  levels = generate_levels(10, 9, turns=8, size=4, seed=5)
+  assert len(levels) == 10
+  assert all(level.is_solvable and level.par <= 9 for level in levels)
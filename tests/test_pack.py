@@ -0,0 +1,26 @@
+import pytest
+
+from classes.pack import LevelPack, LevelPackWriter, MAX_GRID_LIMIT, write_pack
+from classes.path import Path
+
+
+def test_round_trip(tmp_path):
+  levels = [Path(8) for _ in range(20)]
+  filename = tmp_path / "levels.pack"
+  assert write_pack(filename, levels, 8) == 20
+  pack = LevelPack(filename)
+  for level, loaded in zip(levels, pack):
+    assert (loaded.size, loaded.start_pos, loaded.goal_pos) == (level.size, level.start_pos, level.goal_pos)
+    assert loaded.obstacle_mask == level.obstacle_mask
+    assert loaded.par == level.par
+  pack.close()
+
+def test_grid_limit_must_fit_a_byte(tmp_path):
+  with pytest.raises(ValueError):
+    LevelPackWriter(tmp_path / "levels.pack", MAX_GRID_LIMIT + 1)
+
+def test_unsolvable_levels_are_rejected(tmp_path):
+  walled_in = Path(6, [0, 0], [5, 5], [(4, 5), (5, 4)])
+  with LevelPackWriter(tmp_path / "levels.pack", 6) as writer:
+    with pytest.raises(ValueError):
+      writer.add(walled_in)
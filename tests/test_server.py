@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from classes.server import GameClient, GameServer, MAX_GRID_SIZE, FIELD_COMMAND_COUNT, FLAG_WON, FLAG_PLAYING
+from utils.constants import CONSTANTS
+from utils.directions import Direction
+
+
+async def start(server):
+  listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+  ticks = asyncio.create_task(server.run_ticks())
+  return listener, ticks, listener.sockets[0].getsockname()[1]
+
+async def stop(listener, ticks, server):
+  ticks.cancel()
+  listener.close()
+  await listener.wait_closed()
+  server.close()
+
+async def until_sessions_end(server):
+  for _ in range(100):
+    if not server.sessions:
+      return
+    await asyncio.sleep(0.01)
+
+async def receive_until(client, done):
+  while not done():
+    await asyncio.wait_for(client.receive(), 5)
+
+
+def test_client_mirrors_a_winning_run(shortest_program):
+  async def scenario():
+    server = GameServer(tick_ms=5)
+    listener, ticks, port = await start(server)
+    client = await GameClient.connect(port=port)
+    await receive_until(client, lambda: client.path is not None and client.fields)
+    program = shortest_program(client.path)
+    for direction in program:
+      client.add_command(direction)
+    await receive_until(client, lambda: client.fields.get(FIELD_COMMAND_COUNT) == (len(program),))
+    client.play()
+    await receive_until(client, lambda: client.flags & FLAG_WON)
+    assert client.player_pos == client.path.goal_pos
+    assert not client.flags & FLAG_PLAYING
+    await client.close()
+    await stop(listener, ticks, server)
+  asyncio.run(scenario())
+
+def test_sessions_are_dropped_when_clients_leave():
+  async def scenario():
+    server = GameServer(tick_ms=5)
+    listener, ticks, port = await start(server)
+    clients = [await GameClient.connect(port=port) for _ in range(3)]
+    for client in clients:
+      await client.receive()
+      client.add_command(Direction.RIGHT)
+      client.add_command(Direction.LEFT)
+      client.play()
+    await asyncio.sleep(0.02)
+    assert len(server.sessions) == 3
+    for client in clients:
+      await client.close()
+    await until_sessions_end(server)
+    assert not server.sessions and not server.playing
+    await stop(listener, ticks, server)
+  asyncio.run(scenario())
+
+def test_program_length_is_capped():
+  async def scenario():
+    server = GameServer(tick_ms=1000)
+    listener, ticks, port = await start(server)
+    client = await GameClient.connect(port=port)
+    for _ in range(CONSTANTS.SERVER_MAX_COMMANDS + 10):
+      client.add_command(Direction.UP)
+    client.request_state()
+    await receive_until(client, lambda: client.fields.get(FIELD_COMMAND_COUNT) == (CONSTANTS.SERVER_MAX_COMMANDS,))
+    assert len(server.sessions) == 1
+    await client.close()
+    await stop(listener, ticks, server)
+  asyncio.run(scenario())
+
+def test_oversize_grids_are_rejected():
+  with pytest.raises(ValueError):
+    GameServer(grid_size=MAX_GRID_SIZE + 1)
+  with pytest.raises(ValueError):
+    GameServer(grid_size=3)
+
+def test_ticks_continue_while_a_level_is_generated():
+  async def scenario():
+    server = GameServer(grid_size=400, tick_ms=5)
+    ticks_run = []
+    tick = server.tick
+    server.tick = lambda: (ticks_run.append(None), tick())
+    listener, ticks, port = await start(server)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    client = await GameClient.connect(port=port)
+    await receive_until(client, lambda: client.path is not None)
+    elapsed = loop.time() - started
+    # Building a 400-cell board takes far longer than a few ticks, and
+    # they keep coming meanwhile even when the worker shares one core
+    assert elapsed > 0.05
+    assert len(ticks_run) >= elapsed / 0.005 / 10
+    await client.close()
+    await until_sessions_end(server)
+    await stop(listener, ticks, server)
+  asyncio.run(scenario())
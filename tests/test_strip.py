@@ -0,0 +1,36 @@
+from classes.panel import CommandPanel
+from classes.path import Path
+from classes.state import GameState
+from utils.colors import COLORS
+from utils.directions import Direction
+
+
+def long_program():
+  # Back and forth along the top row, never reaching the goal
+  state = GameState([Path(6, [0, 0], [5, 5], [])])
+  for number in range(40):
+    state.add_command(Direction.LEFT if number % 2 else Direction.RIGHT, COLORS.RED)
+  return state
+
+def test_scrubbing_highlights_and_follows_the_current_step():
+  strip = CommandPanel(480).command_strip
+  state = long_program()
+  assert strip.view(state)[2] is None
+  state.step_forward()
+  first, last, current = strip.view(state)
+  assert current == 0 and first == 0
+  for _ in range(24):
+    state.step_forward()
+  first, last, current = strip.view(state)
+  assert current == 24 and first <= current < last
+  state.rewind()
+  assert strip.view(state)[2] is None
+  state.step_forward()
+  assert strip.view(state)[:3:2] == (0, 0)
+
+def test_editing_drops_the_highlight():
+  strip = CommandPanel(480).command_strip
+  state = long_program()
+  state.step_forward()
+  state.add_command(Direction.DOWN, COLORS.RED)
+  assert strip.view(state)[2] is None
@@ -0,0 +1,65 @@
+from functools import partial
+
+import classes.trajectory
+from classes.path import Path
+from classes.state import GameState
+from classes.telemetry import KIND_OUTCOME, KIND_RUN, Telemetry
+from classes.vm import VM
+from utils.colors import COLORS
+from utils.directions import Direction
+from utils.outcomes import Outcome
+
+
+class ListSink:
+  def __init__(self):
+    self.events = []
+
+  def open(self):
+    pass
+
+  def write(self, batch):
+    self.events.extend(batch)
+
+  def close(self):
+    pass
+
+
+def recorded(program, action, obstacles=()):
+  # Runs the program with `action` and returns its (kind, a, b) run events
+  sink = ListSink()
+  telemetry = Telemetry(sink)
+  state = GameState([Path(6, [0, 0], [5, 5], list(obstacles))])
+  telemetry.attach(state)
+  for direction in program:
+    state.add_command(direction, COLORS.RED)
+  action(state)
+  telemetry.close()
+  return [(kind, a, b) for _, kind, _, _, a, b in sink.events if kind in (KIND_RUN, KIND_OUTCOME)]
+
+def play(state):
+  state.play()
+  while state.is_playing:
+    state.execute_next_command()
+
+def scrub(state):
+  for _ in range(len(state.commands) + 2):
+    state.step_forward()
+  # Stepping back over the end and forward again is not another run
+  state.step_back()
+  state.step_forward()
+
+
+def test_outcomes_come_from_the_trajectory():
+  right = [Direction.RIGHT] * 2
+  assert recorded(right + [Direction.DOWN], play, [[2, 1]]) == [(KIND_RUN, 3, 0), (KIND_OUTCOME, Outcome.OBSTACLE, 3)]
+  assert recorded(right + [Direction.UP], play) == [(KIND_RUN, 3, 0), (KIND_OUTCOME, Outcome.OUT_OF_BOUNDS, 3)]
+  assert recorded(right, play) == [(KIND_RUN, 2, 0), (KIND_OUTCOME, Outcome.OUT_OF_COMMANDS, 2)]
+
+def test_budget_exceeded_is_recorded(monkeypatch):
+  monkeypatch.setattr(classes.trajectory, "VM", partial(VM, budget=3))
+  assert recorded([Direction.RIGHT, Direction.LEFT] * 3, play) == [(KIND_RUN, 6, 0),
+                                                                  (KIND_OUTCOME, Outcome.BUDGET_EXCEEDED, 3)]
+
+def test_scrubbing_to_the_end_records_the_run():
+  assert recorded([Direction.RIGHT, Direction.DOWN], scrub) == [(KIND_RUN, 2, 0),
+                                                               (KIND_OUTCOME, Outcome.OUT_OF_COMMANDS, 2)]
@@ -0,0 +1,73 @@
+import random
+
+from classes.batch import evaluate
+from classes.path import Path
+from classes.vm import VM, Call, Repeat, compile_program
+from utils.directions import Direction
+from utils.outcomes import Outcome
+
+
+def random_block(rng, subroutines, depth=0):
+  block = []
+  for _ in range(rng.randint(0, 4)):
+    kind = rng.random()
+    if kind < 0.2 and depth < 2:
+      block.append(Repeat(rng.randint(0, 3), random_block(rng, subroutines, depth + 1)))
+    elif kind < 0.3 and subroutines:
+      block.append(Call(rng.choice(subroutines)))
+    else:
+      block.append(rng.choice(list(Direction)))
+  return block
+
+def random_program(rng):
+  # Subroutines only call ones defined before them, so nothing recurses
+  subroutines = {}
+  for name in "abc":
+    subroutines[name] = random_block(rng, list(subroutines))
+  return random_block(rng, list(subroutines)), subroutines
+
+def expand(block, subroutines):
+  flat = []
+  for item in block:
+    if isinstance(item, Repeat):
+      flat += expand(item.body, subroutines) * max(item.count, 0)
+    elif isinstance(item, Call):
+      flat += expand(subroutines[item.name], subroutines)
+    else:
+      flat.append(item)
+  return flat
+
+
+def winning_program(rng, route):
+  # A known route split between a subroutine, a loop and plain commands,
+  # with a tail that must never run
+  cut = rng.randint(0, len(route))
+  return [Call("a"), Repeat(1, route[cut:]), Repeat(5, [Direction.UP])], {"a": route[:cut]}
+
+
+def test_matches_batch_on_expanded_programs(shortest_program):
+  rng = random.Random(3)
+  paths = [Path(rng.randint(4, 8)) for _ in range(10)]
+  programs = [random_program(rng) for _ in range(300)]
+  programs += [winning_program(rng, shortest_program(path)) for path in paths]
+  result = evaluate([expand(*program) for program in programs], paths)
+  assert set(result.outcome.flat) >= {Outcome.OUT_OF_COMMANDS, Outcome.WIN, Outcome.OUT_OF_BOUNDS,
+                                      Outcome.OBSTACLE}
+  for i, (program, subroutines) in enumerate(programs):
+    code = compile_program(program, subroutines)
+    for j, path in enumerate(paths):
+      vm = VM(code, path)
+      assert vm.run() == result.outcome[i, j]
+      assert vm.position == result.final_pos[i, j].tolist()
+      assert vm.moves == result.steps[i, j]
+
+def test_recursion_runs_out_of_budget():
+  path = Path(6, [0, 0], [5, 5], [])
+  code = compile_program([Call("a")], {"a": [Direction.RIGHT, Direction.LEFT, Call("a")]})
+  assert VM(code, path, budget=1000).run() == Outcome.BUDGET_EXCEEDED
+
+def test_huge_repeat_runs_out_of_budget():
+  path = Path(6, [0, 0], [5, 5], [])
+  vm = VM(compile_program([Repeat(10 ** 9, [Direction.RIGHT, Direction.LEFT])]), path)
+  assert vm.run() == Outcome.BUDGET_EXCEEDED
+  assert vm.position == [0, 0]
@@ -0,0 +1,5 @@
+class CELLS:
+  EMPTY = 0
+  OBSTACLE = 1
+  START = 2
+  GOAL = 3
@@ -1,4 +1,37 @@
 class CONSTANTS:
   CELL_SIZE = 60
   GRID_SIZE = 6
-  COMMAND_PANEL_HEIGHT = 120
\ No newline at end of file
+  # Cells shown on screen; larger boards scroll under a camera
+  VIEWPORT_SIZE = 6
+  COMMAND_PANEL_HEIGHT = 120
+  BUTTON_SIZE = 50
+  CHIP_SIZE = 30
+  PLAY_BUTTON_SIZE = 40
+  COMMAND_INTERVAL_MS = 1000
+  IDLE_TIMEOUT_MS = 1000
+  PREFETCH_LEVELS = 8
+  LEVEL_HISTORY = 50
+  VM_BUDGET = 100000
+  DETOUR_LIMIT = 4096
+  PROFILE_FRAMES = 600
+  PROFILE_FILE = "frame_profile.json"
+  SERVER_PORT = 8765
+  SERVER_WRITE_LIMIT = 64 * 1024
+  TELEMETRY_CAPACITY = 10000
+  TELEMETRY_BATCH = 256
+  TELEMETRY_FLUSH_S = 0.5
+  CURRICULUM_CANDIDATES = 32
+  CURRICULUM_BATCH = 65536
+  ANALYSIS_LENGTH = 12
+  ANALYSIS_CHUNK = 64
+  MAX_SPEED = 8
+  SIMULATION_TICK_MS = 10
+  SIMULATION_MAX_CATCHUP = 25
+  MOVE_ANIMATION_MS = 250
+  FRAME_MS = 16
+  TELEMETRY_BLOCK_MS = 5
+  SERVER_MAX_COMMANDS = 4096
+  # Largest board the game generates. Generation time grows faster than
+  # the area (about 4 s at 1000, 20 s at 1500); positions stay far inside
+  # the signed shorts a Trajectory stores them in.
+  MAX_GRID_SIZE = 1024
\ No newline at end of file
@@ -5,3 +5,14 @@ class Direction(Enum):
   DOWN = "down"
   LEFT = "left"
   RIGHT = "right"
+
+# (dx, dy) applied to a grid position for each direction
+DELTAS = {
+  Direction.UP: (0, -1),
+  Direction.DOWN: (0, 1),
+  Direction.LEFT: (-1, 0),
+  Direction.RIGHT: (1, 0),
+}
+
+# Stable integer codes used by the compact program encodings
+CODES = {direction: code for code, direction in enumerate(Direction)}
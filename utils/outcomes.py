@@ -0,0 +1,8 @@
+from enum import IntEnum
+
+class Outcome(IntEnum):
+  OUT_OF_COMMANDS = 0
+  WIN = 1
+  OUT_OF_BOUNDS = 2
+  OBSTACLE = 3
+  BUDGET_EXCEEDED = 4